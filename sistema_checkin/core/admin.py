@@ -1,17 +1,137 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .emails import enviar_qr_codes_em_lote
 from .models import Participante, Evento, Inscricao
+from .versoes import registrar_alteracao_ao_confirmar
+
+# Abaixo deste número de linhas a contagem exata é barata o suficiente
+LIMITE_CONTAGEM_EXATA = 10000
+
+
+def _estimar_linhas(model):
+    """
+    Estimativa barata do total de linhas de uma tabela, sem COUNT(*): as
+    estatísticas do planejador (pg_class no PostgreSQL, sqlite_stat1 no
+    SQLite, atualizadas pelo ANALYZE). None se o banco não tiver estatísticas.
+    """
+    conexao = connections[model.objects.db]
+    tabela = model._meta.db_table
+    with conexao.cursor() as cursor:
+        if conexao.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [tabela])
+            linha = cursor.fetchone()
+            # -1 significa que a tabela nunca foi analisada
+            return linha[0] if linha and linha[0] is not None and linha[0] >= 0 else None
+        if conexao.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # O primeiro número de 'stat' é o total de linhas da tabela no último ANALYZE
+            cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [tabela])
+            linha = cursor.fetchone()
+            return int(linha[0].split()[0]) if linha else None
+    return None
+
+
+class ContagemEstimadaPaginator(Paginator):
+    """
+    Paginador do admin que evita o COUNT(*) da tabela inteira. Sem filtros,
+    conta no máximo LIMITE_CONTAGEM_EXATA + 1 linhas; se a tabela for maior,
+    usa a estimativa das estatísticas do banco (nunca abaixo do que já foi
+    contado) ou, sem estatísticas, pagina só até esse limite.
+    Com filtros ou busca, a contagem é exata (e restrita pelos índices).
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            limitada = self.object_list.order_by()[:LIMITE_CONTAGEM_EXATA + 1].count()
+            if limitada <= LIMITE_CONTAGEM_EXATA:
+                return limitada
+            return max(_estimar_linhas(self.object_list.model) or 0, limitada)
+        return super().count
+
+
+class EventoRecenteFilter(admin.SimpleListFilter):
+    """Filtro por evento que lista só os eventos mais recentes, não a tabela inteira."""
+    title = 'evento'
+    parameter_name = 'evento'
+    quantidade = 15
+
+    def lookups(self, request, model_admin):
+        eventos = list(Evento.objects.order_by('-data').values_list('id', 'nome')[:self.quantidade])
+        selecionado = self.value()
+        if selecionado and selecionado.isdigit() and int(selecionado) not in {pk for pk, _ in eventos}:
+            eventos += list(Evento.objects.filter(id=selecionado).values_list('id', 'nome'))
+        return [(str(pk), nome) for pk, nome in eventos]
+
+    def queryset(self, request, queryset):
+        if self.value() and self.value().isdigit():
+            return queryset.filter(evento_id=self.value())
+        return queryset
+
 
 @admin.register(Participante)
 class ParticipanteAdmin(admin.ModelAdmin):
-    list_display = ('nome', 'matricula', 'email')
+    list_display = ('nome', 'matricula', 'email', 'ativo')
+    list_filter = ('ativo',)
+    ordering = ('nome',)
     search_fields = ('nome', 'matricula')
+    show_full_result_count = False
+    paginator = ContagemEstimadaPaginator
+    actions = ['reenviar_email']
+
+    @admin.action(description="Reenviar e-mail com QR Code")
+    def reenviar_email(self, request, queryset):
+        enviados, falhas = enviar_qr_codes_em_lote(queryset.iterator())
+        self.message_user(request, f"{enviados} e-mails enviados.")
+        if falhas:
+            self.message_user(request, f"Falha ao enviar para: {', '.join(falhas)}", level='error')
 
 @admin.register(Evento)
 class EventoAdmin(admin.ModelAdmin):
     list_display = ('nome', 'data')
+    search_fields = ('nome',)
+    date_hierarchy = 'data'
+    ordering = ('-data',)
 
 @admin.register(Inscricao)
 class InscricaoAdmin(admin.ModelAdmin):
     list_display = ('participante', 'evento', 'status', 'data_checkin')
-    list_filter = ('evento', 'status')
+    list_filter = ('status', EventoRecenteFilter)
+    list_select_related = ('participante', 'evento')
+    autocomplete_fields = ('participante', 'evento')
     search_fields = ('participante__nome', 'participante__matricula')
+    date_hierarchy = 'data_checkin'
+    show_full_result_count = False
+    paginator = ContagemEstimadaPaginator
+    actions = ['marcar_presenca', 'mover_para_lista_espera', 'reenviar_email']
+
+    # As ações abaixo são UPDATEs únicos sobre a seleção: não chamam save()
+    # e, portanto, não disparam sinais, daí o registro explícito da alteração.
+
+    @admin.action(description="Marcar presença")
+    def marcar_presenca(self, request, queryset):
+        evento_ids = list(queryset.values_list('evento_id', flat=True).distinct())
+        total = queryset.exclude(status='PRESENTE').update(status='PRESENTE', data_checkin=timezone.now())
+        registrar_alteracao_ao_confirmar(evento_ids)
+        self.message_user(request, f"{total} inscrições marcadas como presentes.")
+
+    @admin.action(description="Mover para a lista de espera")
+    def mover_para_lista_espera(self, request, queryset):
+        evento_ids = list(queryset.values_list('evento_id', flat=True).distinct())
+        total = queryset.update(status='LISTA_ESPERA', data_checkin=None, data_entrada_espera=timezone.now())
+        registrar_alteracao_ao_confirmar(evento_ids)
+        self.message_user(request, f"{total} inscrições movidas para a lista de espera.")
+
+    @admin.action(description="Reenviar e-mail com QR Code")
+    def reenviar_email(self, request, queryset):
+        participantes = Participante.objects.filter(inscricoes__in=queryset).distinct()
+        enviados, falhas = enviar_qr_codes_em_lote(participantes.iterator())
+        self.message_user(request, f"{enviados} e-mails enviados.")
+        if falhas:
+            self.message_user(request, f"Falha ao enviar para: {', '.join(falhas)}", level='error')
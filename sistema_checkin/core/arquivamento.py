@@ -0,0 +1,152 @@
+"""
+Arquivamento de eventos encerrados.
+
+Eventos antigos e suas inscrições são movidos do banco principal para o banco
+'arquivo' (ver core/routers.py), mantendo as tabelas usadas no check-in
+pequenas. As exportações leem as duas fontes por meio de `presencas_todos_eventos`.
+"""
+import heapq
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import Participante, Evento, Inscricao, EventoArquivado, InscricaoArquivada
+from .routers import BANCO_ARQUIVO
+from .utils import em_lotes
+
+TAMANHO_LOTE = 2000
+
+
+def eventos_para_arquivar(antes_de):
+    """Eventos cuja data é anterior a `antes_de` (um datetime)."""
+    return Evento.objects.filter(data__lt=antes_de).order_by('data')
+
+
+def _arquivar_evento(evento, agora, tamanho_lote):
+    # O bloco interno (arquivo, que recebe a cópia) confirma primeiro e o
+    # externo (apagar do banco principal) por último: se a cópia falhar, o
+    # evento continua no banco principal. Se só a remoção falhar, sobra uma
+    # cópia no arquivo, que é descartada na próxima tentativa.
+    with transaction.atomic(using='default'), transaction.atomic(using=BANCO_ARQUIVO):
+        EventoArquivado.objects.filter(id=evento.id).delete()
+        evento_arquivado = EventoArquivado.objects.create(
+            id=evento.id, nome=evento.nome, data=evento.data, vagas=evento.vagas, arquivado_em=agora,
+        )
+        linhas = (
+            Inscricao.objects.filter(evento=evento).order_by('pk')
+            .values_list(
+                'id', 'participante_id', 'participante__nome', 'participante__matricula',
+                'participante__email', 'status', 'data_checkin', 'data_entrada_espera',
+            )
+            .iterator(chunk_size=tamanho_lote)
+        )
+        total = 0
+        for lote in em_lotes(linhas, tamanho_lote):
+            InscricaoArquivada.objects.bulk_create([
+                InscricaoArquivada(
+                    id=id_, evento=evento_arquivado, participante_id=participante_id,
+                    participante_nome=nome, participante_matricula=matricula, participante_email=email,
+                    status=status, data_checkin=data_checkin, data_entrada_espera=data_entrada_espera,
+                )
+                for id_, participante_id, nome, matricula, email, status, data_checkin, data_entrada_espera in lote
+            ])
+            total += len(lote)
+        Inscricao.objects.filter(evento=evento).delete()
+        evento.delete()
+    return total
+
+
+def arquivar_eventos(antes_de, simular=False, tamanho_lote=TAMANHO_LOTE):
+    """
+    Move para o banco de arquivo os eventos anteriores a `antes_de`, um por
+    transação. Com `simular=True` apenas conta o que seria movido.
+    Retorna uma lista de (evento, número de inscrições).
+    """
+    resultado = []
+    agora = timezone.now()
+    for evento in eventos_para_arquivar(antes_de):
+        if simular:
+            resultado.append((evento, evento.inscricoes.count()))
+        else:
+            resultado.append((evento, _arquivar_evento(evento, agora, tamanho_lote)))
+    return resultado
+
+
+def restaurar_evento(evento_id, tamanho_lote=TAMANHO_LOTE):
+    """
+    Devolve um evento arquivado (com o mesmo id) e suas inscrições ao banco
+    principal. Inscrições de participantes que não existem mais são descartadas.
+    Retorna (evento, inscrições restauradas, inscrições descartadas).
+    """
+    arquivado = EventoArquivado.objects.get(id=evento_id)
+    restauradas, descartadas = 0, 0
+    # Como em _arquivar_evento: o banco que recebe os dados (principal,
+    # bloco interno) confirma antes de o arquivo apagar a sua cópia.
+    with transaction.atomic(using=BANCO_ARQUIVO), transaction.atomic(using='default'):
+        evento = Evento.objects.create(id=arquivado.id, nome=arquivado.nome, data=arquivado.data, vagas=arquivado.vagas)
+        linhas = (
+            arquivado.inscricoes.order_by('pk')
+            .values_list('id', 'participante_id', 'status', 'data_checkin', 'data_entrada_espera')
+            .iterator(chunk_size=tamanho_lote)
+        )
+        for lote in em_lotes(linhas, tamanho_lote):
+            existentes = set(
+                Participante.objects.filter(pk__in=[linha[1] for linha in lote]).values_list('pk', flat=True)
+            )
+            novas = [
+                Inscricao(
+                    id=id_, evento=evento, participante_id=participante_id, status=status,
+                    data_checkin=data_checkin, data_entrada_espera=data_entrada_espera,
+                )
+                for id_, participante_id, status, data_checkin, data_entrada_espera in lote
+                if participante_id in existentes
+            ]
+            Inscricao.objects.bulk_create(novas)
+            restauradas += len(novas)
+            descartadas += len(lote) - len(novas)
+        arquivado.inscricoes.all().delete()
+        arquivado.delete()
+    return evento, restauradas, descartadas
+
+
+def compactar_banco_principal():
+    """
+    Executa VACUUM no banco principal (SQLite) para devolver o espaço liberado
+    e ANALYZE para atualizar as estatísticas usadas na paginação do admin.
+    """
+    conexao = connections['default']
+    if conexao.vendor == 'sqlite':
+        with conexao.cursor() as cursor:
+            cursor.execute('VACUUM')
+            cursor.execute('ANALYZE')
+
+
+def presencas_todos_eventos():
+    """
+    Itera sobre as presenças de todos os eventos, arquivados ou não, em ordem
+    de data do evento e nome do participante. Cada item é uma tupla
+    (nome do evento, nome, matrícula, e-mail, data do check-in).
+    """
+    arquivadas = (
+        InscricaoArquivada.objects.filter(status='PRESENTE')
+        .order_by('evento__data', 'evento_id', 'participante_nome')
+        .values_list(
+            'evento__data', 'evento_id', 'evento__nome',
+            'participante_nome', 'participante_matricula', 'participante_email', 'data_checkin',
+        )
+    )
+    ativas = (
+        Inscricao.objects.filter(status='PRESENTE')
+        .order_by('evento__data', 'evento_id', 'participante__nome')
+        .values_list(
+            'evento__data', 'evento_id', 'evento__nome',
+            'participante__nome', 'participante__matricula', 'participante__email', 'data_checkin',
+        )
+    )
+    # As duas consultas já vêm ordenadas; o merge só intercala os fluxos
+    for linha in heapq.merge(
+        arquivadas.iterator(chunk_size=TAMANHO_LOTE),
+        ativas.iterator(chunk_size=TAMANHO_LOTE),
+        key=lambda linha: linha[:2],
+    ):
+        yield linha[2:]
@@ -0,0 +1,258 @@
+"""
+Geração de folhas de crachás (nome, CPF e QR Code) em PDF para impressão.
+
+As páginas são desenhadas em paralelo por um pool de processos compartilhado
+entre os downloads e o PDF é produzido como um gerador de bytes, página a
+página, para poder ser enviado numa StreamingHttpResponse ou gravado em disco
+sem montar o arquivo inteiro na memória: só algumas páginas ficam em
+andamento de cada vez (ver `_renderizar_em_ordem`).
+
+Este módulo não importa o Django no nível do módulo: os processos filhos
+só precisam de Pillow e qrcode (via core/qrcodes.py) para desenhar as páginas.
+"""
+import os
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .qrcodes import codificar_compacto, montar_qrcode
+
+# Página A4 renderizada a 150 DPI
+LARGURA_PAGINA = 1240
+ALTURA_PAGINA = 1754
+MARGEM = 60
+LARGURA_PDF = 595.28
+ALTURA_PDF = 841.89
+
+COLUNAS_PADRAO = 2
+LINHAS_PADRAO = 4
+
+# A fonte embutida do Pillow não tem letras acentuadas ("José Gonçalves" sairia
+# com quadrados): usa a DejaVu Sans distribuída com o app (core/fontes, licença
+# em LICENSE-DejaVu.txt) e, na falta dela, uma fonte do sistema com Latin-1.
+FONTES = (
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fontes', 'DejaVuSans.ttf'),
+    'DejaVuSans.ttf',
+    'arial.ttf',
+)
+
+# Pools de processos já criados, por número de processos
+_pools = {}
+_trava_pools = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _fonte(tamanho):
+    for caminho in FONTES:
+        try:
+            return ImageFont.truetype(caminho, tamanho)
+        except OSError:
+            continue
+    raise OSError(f"Nenhuma fonte TrueType encontrada para os crachás: {', '.join(FONTES)}")
+
+
+def _imagem_qr(conteudo, lado):
+    """
+    Desenha o QR Code a partir da matriz de módulos (um pixel por módulo) e
+    amplia sem interpolação; é bem mais rápido que a fábrica de imagens do
+    qrcode, que desenha cada módulo como um retângulo.
+    """
+    matriz = montar_qrcode(conteudo).get_matrix()
+    tamanho = len(matriz)
+    pixels = bytes(0 if modulo else 255 for linha in matriz for modulo in linha)
+    return Image.frombytes('L', (tamanho, tamanho), pixels).resize((lado, lado), Image.NEAREST)
+
+
+def _ajustar_texto(desenho, texto, fonte, largura_maxima):
+    """Corta o texto com reticências até caber na largura do crachá."""
+    if desenho.textlength(texto, font=fonte) <= largura_maxima:
+        return texto
+    while texto and desenho.textlength(texto + '…', font=fonte) > largura_maxima:
+        texto = texto[:-1]
+    return texto + '…'
+
+
+def _renderizar_pagina(args):
+    """
+    Desenha uma página de crachás. Recebe (crachas, colunas, linhas), onde
+    cada crachá é uma tupla (nome, cpf, conteúdo do QR), e devolve a página
+    em tons de cinza já comprimida com zlib, pronta para o PDF.
+    """
+    crachas, colunas, linhas = args
+    pagina = Image.new('L', (LARGURA_PAGINA, ALTURA_PAGINA), 255)
+    desenho = ImageDraw.Draw(pagina)
+
+    largura_cracha = (LARGURA_PAGINA - 2 * MARGEM) // colunas
+    altura_cracha = (ALTURA_PAGINA - 2 * MARGEM) // linhas
+    fonte_nome = _fonte(max(16, altura_cracha // 12))
+    fonte_cpf = _fonte(max(12, altura_cracha // 16))
+    altura_texto = altura_cracha // 4
+
+    for posicao, (nome, cpf, conteudo_qr) in enumerate(crachas):
+        x = MARGEM + (posicao % colunas) * largura_cracha
+        y = MARGEM + (posicao // colunas) * altura_cracha
+
+        # Linha de corte
+        desenho.rectangle([x, y, x + largura_cracha - 1, y + altura_cracha - 1], outline=160)
+
+        lado_qr = min(largura_cracha, altura_cracha - altura_texto) - 20
+        pagina.paste(_imagem_qr(conteudo_qr, lado_qr), (x + (largura_cracha - lado_qr) // 2, y + 10))
+
+        largura_texto = largura_cracha - 20
+        y_texto = y + 10 + lado_qr + 5
+        desenho.text(
+            (x + largura_cracha // 2, y_texto), _ajustar_texto(desenho, nome, fonte_nome, largura_texto),
+            fill=0, font=fonte_nome, anchor='ma',
+        )
+        desenho.text(
+            (x + largura_cracha // 2, y_texto + altura_texto // 2), f"CPF: {cpf}",
+            fill=0, font=fonte_cpf, anchor='ma',
+        )
+
+    return zlib.compress(pagina.tobytes(), 1)
+
+
+def _paginar(crachas, colunas, linhas):
+    por_pagina = colunas * linhas
+    pagina = []
+    for cracha in crachas:
+        pagina.append(tuple(str(campo) for campo in cracha))
+        if len(pagina) == por_pagina:
+            yield (pagina, colunas, linhas)
+            pagina = []
+    if pagina:
+        yield (pagina, colunas, linhas)
+
+
+def _executor(processos):
+    """
+    Pool compartilhado entre as requisições, criado no primeiro uso: abrir um
+    pool a cada download custaria iniciar todos os processos filhos de novo.
+    """
+    with _trava_pools:
+        executor = _pools.get(processos)
+        if executor is None:
+            executor = _pools[processos] = ProcessPoolExecutor(max_workers=processos)
+        return executor
+
+
+def _descartar_executor(processos, executor):
+    with _trava_pools:
+        if _pools.get(processos) is executor:
+            del _pools[processos]
+    executor.shutdown(wait=False)
+
+
+def _renderizar_em_ordem(paginas, processos):
+    """
+    Desenha as páginas no pool e as devolve na ordem original, com no máximo
+    2 x `processos` páginas em andamento ou prontas à espera do cliente: a
+    próxima página só é enviada ao pool quando a mais antiga é entregue.
+    Assim nem o iterador do banco é esvaziado de uma vez nem as páginas
+    prontas se acumulam quando o download é lento.
+    """
+    executor = _executor(processos)
+    janela = 2 * (processos or os.cpu_count() or 1)
+    pendentes = deque()
+    try:
+        for pagina in paginas:
+            pendentes.append(executor.submit(_renderizar_pagina, pagina))
+            if len(pendentes) >= janela:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+    except BrokenProcessPool:
+        # Um processo filho morreu; o próximo download cria um pool novo
+        _descartar_executor(processos, executor)
+        raise
+    finally:
+        # Se o download for interrompido, descarta as páginas ainda na fila
+        for futuro in pendentes:
+            futuro.cancel()
+
+
+def _escrever_pdf(paginas_comprimidas):
+    """
+    Gera um PDF em que cada página é uma imagem em tons de cinza (FlateDecode).
+    O objeto /Pages é escrito por último, pois só então se conhece o total de
+    páginas; isso permite emitir cada página assim que ela fica pronta.
+    """
+    deslocamentos = {}
+    posicao = 0
+
+    def objeto(numero, corpo, fluxo=None):
+        nonlocal posicao
+        deslocamentos[numero] = posicao
+        dados = f"{numero} 0 obj\n".encode() + corpo
+        if fluxo is not None:
+            dados += b"\nstream\n" + fluxo + b"\nendstream"
+        dados += b"\nendobj\n"
+        posicao += len(dados)
+        return dados
+
+    cabecalho = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    posicao = len(cabecalho)
+    yield cabecalho
+    yield objeto(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    paginas = []
+    numero = 3
+    for imagem in paginas_comprimidas:
+        num_imagem, num_conteudo, num_pagina = numero, numero + 1, numero + 2
+        numero += 3
+        yield objeto(
+            num_imagem,
+            f"<< /Type /XObject /Subtype /Image /Width {LARGURA_PAGINA} /Height {ALTURA_PAGINA} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode /Length {len(imagem)} >>".encode(),
+            imagem,
+        )
+        conteudo = f"q {LARGURA_PDF} 0 0 {ALTURA_PDF} 0 0 cm /Im0 Do Q".encode()
+        yield objeto(num_conteudo, f"<< /Length {len(conteudo)} >>".encode(), conteudo)
+        yield objeto(
+            num_pagina,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {LARGURA_PDF} {ALTURA_PDF}] "
+            f"/Resources << /XObject << /Im0 {num_imagem} 0 R >> >> /Contents {num_conteudo} 0 R >>".encode(),
+        )
+        paginas.append(num_pagina)
+
+    filhos = ' '.join(f"{n} 0 R" for n in paginas)
+    yield objeto(2, f"<< /Type /Pages /Kids [{filhos}] /Count {len(paginas)} >>".encode())
+
+    inicio_xref = posicao
+    xref = [f"xref\n0 {numero}\n", "0000000000 65535 f \n"]
+    xref += [f"{deslocamentos[n]:010d} 00000 n \n" for n in range(1, numero)]
+    xref.append(f"trailer\n<< /Size {numero} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n")
+    yield ''.join(xref).encode()
+
+
+def dados_crachas(evento=None):
+    """
+    Retorna um iterador de (nome, cpf, conteúdo do QR) em ordem alfabética,
+    dos inscritos no `evento` ou de toda a base quando nenhum é informado.
+    Participantes inativos ficam de fora.
+    O QR sai sempre no formato compacto, mesmo para quem ainda não teve a
+    imagem reemitida: o totem aceita os dois formatos.
+    """
+    from .models import Participante
+
+    participantes = Participante.objects.filter(ativo=True)
+    if evento is not None:
+        participantes = participantes.filter(inscricoes__evento=evento)
+    linhas = participantes.order_by('nome').values_list('nome', 'matricula', 'id_unico_qr').iterator()
+    return ((nome, cpf, codificar_compacto(id_unico_qr)) for nome, cpf, id_unico_qr in linhas)
+
+
+def gerar_pdf_crachas(crachas, colunas=COLUNAS_PADRAO, linhas=LINHAS_PADRAO, processos=None):
+    """
+    Gera, em partes, o PDF das folhas de crachás.
+
+    `crachas` é um iterável de tuplas (nome, cpf, conteúdo do QR). As páginas
+    são desenhadas por um ProcessPoolExecutor com `processos` trabalhadores
+    (padrão: número de CPUs) e emitidas na ordem original.
+    """
+    yield from _escrever_pdf(_renderizar_em_ordem(_paginar(crachas, colunas, linhas), processos))
@@ -0,0 +1,79 @@
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Participante
+from .utils import em_lotes
+from .versoes import registrar_alteracao_ao_confirmar
+
+
+def _montar_email_qr_code(participante, conexao=None):
+    """Monta a mensagem com o QR Code do participante em anexo."""
+    contexto_email = {'nome_participante': participante.nome}
+    corpo_email = render_to_string('core/email_qrcode_geral.html', contexto_email)
+
+    email = EmailMessage(
+        subject="Seu QR Code de Acesso para Eventos",
+        body=corpo_email,
+        from_email=None,
+        to=[participante.email],
+        connection=conexao,
+    )
+    email.content_subtype = "html"
+    email.attach_file(participante.qr_code_img.path)
+    return email
+
+
+def enviar_qr_code_email(participante):
+    """
+    Função auxiliar que monta e envia o e-mail com QR Code para um participante.
+    Atualiza o campo 'ultimo_envio_email' se o envio for bem-sucedido.
+    Retorna True se o e-mail foi enviado com sucesso, False caso contrário.
+    """
+    if not participante.qr_code_img:
+        return False
+    
+    try:
+        _montar_email_qr_code(participante).send()
+
+        # Se o e-mail foi enviado, atualiza o campo com a data e hora atuais
+        participante.ultimo_envio_email = timezone.now()
+        participante.save(update_fields=['ultimo_envio_email'])
+
+        return True
+    except Exception as e:
+        print(f"Erro ao enviar e-mail para {participante.nome}: {e}")
+        return False
+
+
+def enviar_qr_codes_em_lote(participantes):
+    """
+    Envia o QR Code para vários participantes reaproveitando uma única conexão
+    SMTP e grava 'ultimo_envio_email' de todos os envios bem-sucedidos com um
+    UPDATE por lote, em vez de um save() por participante.
+    Retorna (quantidade enviada, lista de nomes com falha).
+    """
+    enviados, falhas = [], []
+    try:
+        with get_connection() as conexao:
+            for participante in participantes:
+                if not participante.qr_code_img:
+                    falhas.append(participante.nome)
+                    continue
+                try:
+                    _montar_email_qr_code(participante, conexao).send()
+                    enviados.append(participante.pk)
+                except Exception as e:
+                    print(f"Erro ao enviar e-mail para {participante.nome}: {e}")
+                    falhas.append(participante.nome)
+    except Exception as e:
+        # Falha ao abrir ou fechar a conexão com o servidor de e-mail
+        print(f"Erro na conexão com o servidor de e-mail: {e}")
+
+    agora = timezone.now()
+    for lote in em_lotes(enviados, 500):
+        Participante.objects.filter(pk__in=lote).update(ultimo_envio_email=agora)
+    if enviados:
+        # update() não dispara sinais; o status de envio aparece na lista geral
+        registrar_alteracao_ao_confirmar(participantes=True)
+    return len(enviados), falhas
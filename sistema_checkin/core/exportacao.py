@@ -0,0 +1,261 @@
+"""
+Exportação colunar (Parquet) de eventos, participantes e inscrições.
+
+Estrutura gerada dentro do diretório de destino:
+
+    eventos/dia=AAAA-MM-DD/parte-00000.parquet
+    inscricoes/dia=AAAA-MM-DD/parte-00000.parquet
+    participantes/parte-00000.parquet
+    manifesto.json
+
+Eventos e inscrições são particionados pelo dia (horário local) do evento e
+incluem os eventos já movidos para o banco de arquivo (core/arquivamento.py).
+O manifesto guarda uma assinatura de cada evento; nas execuções seguintes
+apenas as partições dos dias com eventos alterados são reescritas.
+
+Exportações simultâneas (o botão no painel e o comando, por exemplo) são
+serializadas por uma trava de arquivo no diretório de destino; quem lê o
+diretório, como o download em .zip, deve segurar a mesma trava.
+"""
+import hashlib
+import itertools
+import json
+import os
+import shutil
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+from django.db.models import Count, Q
+from django.utils.timezone import localtime
+
+from .models import Participante, Evento, Inscricao, EventoArquivado, InscricaoArquivada
+from .utils import em_lotes
+
+TAMANHO_LOTE = 5000
+NOME_MANIFESTO = 'manifesto.json'
+NOME_TRAVA = '.exportacao.lock'
+
+# Tipos fixos por coluna, para que todas as partes tenham o mesmo schema
+# (um lote só com datas nulas não pode virar uma coluna sem tipo).
+COLUNAS_EVENTO = {'id': 'int64', 'nome': 'string', 'data': 'datetime', 'vagas': 'int64'}
+COLUNAS_INSCRICAO = {
+    'id': 'int64',
+    'evento_id': 'int64',
+    'participante_id': 'int64',
+    'status': 'string',
+    'data_checkin': 'datetime',
+    'data_entrada_espera': 'datetime',
+}
+COLUNAS_PARTICIPANTE = {
+    'id': 'int64',
+    'nome': 'string',
+    'matricula': 'string',
+    'email': 'string',
+    'id_unico_qr': 'string',
+    'ultimo_envio_email': 'datetime',
+}
+
+
+@contextmanager
+def trava_exportacao(destino):
+    """
+    Trava exclusiva sobre o diretório de exportação, válida entre processos
+    (servidor e comandos). Bloqueia até que a exportação em andamento termine.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    with open(destino / NOME_TRAVA, 'a+b') as arquivo:
+        if os.name == 'nt':
+            import msvcrt
+            arquivo.seek(0)
+            while True:
+                try:
+                    # LK_LOCK desiste após ~10s de espera; tenta de novo
+                    msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                arquivo.seek(0)
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(arquivo, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+def _dataframe(lote, colunas):
+    df = pd.DataFrame.from_records(lote, columns=list(colunas))
+    for coluna, tipo in colunas.items():
+        if tipo == 'datetime':
+            df[coluna] = pd.to_datetime(df[coluna], utc=True).astype('datetime64[us, UTC]')
+        elif tipo == 'string':
+            df[coluna] = df[coluna].astype('string')
+        else:
+            df[coluna] = df[coluna].astype(tipo)
+    return df
+
+
+def _escrever_partes(pasta, querysets, colunas, tamanho_lote):
+    """
+    Escreve os querysets, em sequência, em arquivos 'parte-NNNNN.parquet' de até `tamanho_lote`
+    linhas. Grava numa pasta temporária e só depois substitui a pasta final,
+    para que um leitor nunca veja uma partição pela metade.
+    Retorna o número de linhas escritas.
+    """
+    temporaria = pasta.with_name(f'.{pasta.name}.tmp')
+    shutil.rmtree(temporaria, ignore_errors=True)
+
+    total = 0
+    linhas = itertools.chain.from_iterable(
+        queryset.values_list(*colunas).iterator(chunk_size=tamanho_lote) for queryset in querysets
+    )
+    for numero, lote in enumerate(em_lotes(linhas, tamanho_lote)):
+        temporaria.mkdir(parents=True, exist_ok=True)
+        _dataframe(lote, colunas).to_parquet(temporaria / f'parte-{numero:05d}.parquet', index=False)
+        total += len(lote)
+
+    shutil.rmtree(pasta, ignore_errors=True)
+    if temporaria.exists():
+        temporaria.rename(pasta)
+    return total
+
+
+def _assinatura_evento(evento, resumo_inscricoes):
+    partes = (
+        evento.nome, evento.data.isoformat(), evento.vagas,
+        *(getattr(evento, f'total_{status.lower()}') for status, _ in Inscricao.STATUS_CHOICES),
+        resumo_inscricoes,
+    )
+    return hashlib.sha1('|'.join(str(p) for p in partes).encode('utf-8')).hexdigest()
+
+
+def _resumo_inscricoes(tamanho_lote):
+    """
+    Retorna {id_evento: resumo} com um resumo de todas as colunas exportadas
+    das inscrições de cada evento: a soma (módulo 2**160) do sha1 de cada
+    linha. Não depende da ordem das linhas e muda com qualquer edição, como
+    um status trocado no admin ou um check-in corrigido para mais cedo.
+    """
+    resumos = defaultdict(int)
+    linhas = Inscricao.objects.order_by().values_list(*COLUNAS_INSCRICAO)
+    for linha in linhas.iterator(chunk_size=tamanho_lote):
+        evento_id = linha[1]
+        hash_linha = hashlib.sha1('|'.join(str(valor) for valor in linha).encode('utf-8')).digest()
+        resumos[evento_id] = (resumos[evento_id] + int.from_bytes(hash_linha, 'big')) % (1 << 160)
+    return resumos
+
+
+def _ler_manifesto(destino):
+    try:
+        with open(destino / NOME_MANIFESTO, encoding='utf-8') as f:
+            return json.load(f)['eventos']
+    except (FileNotFoundError, KeyError, ValueError):
+        return {}
+
+
+def _estado_atual_eventos(tamanho_lote):
+    """Retorna {id_evento: {'assinatura', 'dia'}}: contagens por status e o resumo das inscrições."""
+    eventos = Evento.objects.annotate(**{
+        f'total_{status.lower()}': Count('inscricoes', filter=Q(inscricoes__status=status))
+        for status, _ in Inscricao.STATUS_CHOICES
+    }).order_by('pk')
+    resumos = _resumo_inscricoes(tamanho_lote)
+
+    estado = {}
+    for evento in eventos.iterator(chunk_size=tamanho_lote):
+        estado[str(evento.pk)] = {
+            'assinatura': _assinatura_evento(evento, resumos.get(evento.pk, 0)),
+            'dia': localtime(evento.data).date().isoformat(),
+        }
+
+    # Eventos arquivados não mudam mais; a assinatura só marca quando foram movidos
+    arquivados = EventoArquivado.objects.order_by('pk').values_list('pk', 'data', 'arquivado_em')
+    for pk, data, arquivado_em in arquivados.iterator(chunk_size=tamanho_lote):
+        estado[str(pk)] = {
+            'assinatura': hashlib.sha1(f'arquivado|{arquivado_em.isoformat()}'.encode('utf-8')).hexdigest(),
+            'dia': localtime(data).date().isoformat(),
+        }
+    return estado
+
+
+def exportar_parquet(destino, completo=False, tamanho_lote=TAMANHO_LOTE):
+    """
+    Exporta a base para `destino` em Parquet. Por padrão é incremental: só os
+    dias com eventos novos, alterados ou removidos desde a última execução são
+    reescritos. Com `completo=True` tudo é regerado.
+    Retorna um dicionário com o resumo da exportação.
+    """
+    destino = Path(destino)
+    with trava_exportacao(destino):
+        return _exportar(destino, completo, tamanho_lote)
+
+
+def _exportar(destino, completo, tamanho_lote):
+    if completo:
+        for subpasta in ('eventos', 'inscricoes'):
+            shutil.rmtree(destino / subpasta, ignore_errors=True)
+    destino.mkdir(parents=True, exist_ok=True)
+
+    anterior = {} if completo else _ler_manifesto(destino)
+    atual = _estado_atual_eventos(tamanho_lote)
+
+    dias_alterados = set()
+    eventos_alterados = 0
+    for chave, info in atual.items():
+        antigo = anterior.get(chave)
+        if antigo != info:
+            eventos_alterados += 1
+            dias_alterados.add(info['dia'])
+            if antigo:
+                dias_alterados.add(antigo['dia'])
+    for chave in anterior.keys() - atual.keys():
+        dias_alterados.add(anterior[chave]['dia'])
+
+    ids_por_dia = defaultdict(list)
+    for chave, info in atual.items():
+        ids_por_dia[info['dia']].append(int(chave))
+
+    inscricoes_exportadas = 0
+    for dia in sorted(dias_alterados):
+        ids = ids_por_dia.get(dia, [])
+        _escrever_partes(
+            destino / 'eventos' / f'dia={dia}',
+            [
+                Evento.objects.filter(pk__in=ids).order_by('pk'),
+                EventoArquivado.objects.filter(pk__in=ids).order_by('pk'),
+            ],
+            COLUNAS_EVENTO, tamanho_lote,
+        )
+        inscricoes_exportadas += _escrever_partes(
+            destino / 'inscricoes' / f'dia={dia}',
+            [
+                Inscricao.objects.filter(evento_id__in=ids).order_by('evento_id', 'pk'),
+                InscricaoArquivada.objects.filter(evento_id__in=ids).order_by('evento_id', 'pk'),
+            ],
+            COLUNAS_INSCRICAO, tamanho_lote,
+        )
+
+    # Participantes não têm data própria: a tabela é sempre regravada, em lotes.
+    participantes_exportados = _escrever_partes(
+        destino / 'participantes',
+        [Participante.objects.order_by('pk')],
+        COLUNAS_PARTICIPANTE, tamanho_lote,
+    )
+
+    with open(destino / NOME_MANIFESTO, 'w', encoding='utf-8') as f:
+        json.dump({'eventos': atual}, f)
+
+    return {
+        'eventos_alterados': eventos_alterados,
+        'dias_reescritos': len(dias_alterados),
+        'inscricoes_exportadas': inscricoes_exportadas,
+        'participantes_exportados': participantes_exportados,
+    }
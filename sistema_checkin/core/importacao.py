@@ -0,0 +1,356 @@
+"""
+Importação em lote de participantes e inscrições a partir de arquivos CSV.
+
+Substitui o antigo script Processar_CSV_eventosIFF.py: em vez de reescrever
+o CSV para o formato esperado pelas telas de upload, o arquivo é lido em
+fluxo, com mapeamento de colunas configurável, e gravado diretamente no
+banco em lotes (bulk_create/bulk_update).
+"""
+import codecs
+import csv
+import itertools
+import unicodedata
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .models import Participante, Inscricao, calcular_hash_conteudo
+from .utils import em_lotes
+from .versoes import registrar_alteracao_ao_confirmar
+
+TAMANHO_LOTE = 500
+TAMANHO_AMOSTRA = 64 * 1024
+CAMPOS = ('nome', 'matricula', 'email')
+
+# Nomes de cabeçalho reconhecidos para cada campo (já normalizados)
+SINONIMOS = {
+    'nome': {'nome', 'nomecompleto', 'name'},
+    'matricula': {'matricula', 'cpf'},
+    'email': {'email', 'mail'},
+}
+
+
+def _recorrer_cp1252(erro):
+    """
+    Tratador de erros de decodificação: bytes inválidos no encoding detectado
+    são lidos como cp1252. A detecção olha só o início do arquivo, e uma
+    planilha "UTF-8" pode trazer um 'ç' gravado em cp1252 muitas linhas
+    adiante; sem isso a importação pararia no meio, com os lotes anteriores
+    já gravados.
+    """
+    if not isinstance(erro, UnicodeDecodeError):
+        raise erro
+    return erro.object[erro.start:erro.end].decode('cp1252', errors='replace'), erro.end
+
+
+codecs.register_error('importacao_cp1252', _recorrer_cp1252)
+
+
+def _normalizar_cabecalho(texto):
+    texto = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return ''.join(c for c in texto.lower() if c.isalnum())
+
+
+def detectar_formato(caminho, encoding=None, delimitador=None, cabecalho=None):
+    """
+    Detecta, a partir do início do arquivo, o que não foi informado: encoding
+    (UTF-8 com ou sem BOM, senão cp1252), delimitador e presença de cabeçalho.
+    Retorna (encoding, delimitador, tem_cabecalho).
+    """
+    with open(caminho, 'rb') as f:
+        amostra_bytes = f.read(TAMANHO_AMOSTRA)
+
+    if encoding is None:
+        try:
+            # final=False: a amostra pode terminar no meio de um caractere
+            codecs.getincrementaldecoder('utf-8-sig')().decode(amostra_bytes, final=False)
+            encoding = 'utf-8-sig'
+        except UnicodeDecodeError:
+            encoding = 'cp1252'
+    amostra = codecs.getincrementaldecoder(encoding)(errors='replace').decode(amostra_bytes, final=False)
+    # Descarta a última linha da amostra, que pode estar incompleta
+    if len(amostra_bytes) == TAMANHO_AMOSTRA and '\n' in amostra:
+        amostra = amostra[:amostra.rindex('\n')]
+
+    if delimitador is None:
+        try:
+            delimitador = csv.Sniffer().sniff(amostra, delimiters=',;\t|').delimiter
+        except csv.Error:
+            delimitador = ','
+
+    if cabecalho is None:
+        primeira = next(csv.reader(amostra.splitlines(), delimiter=delimitador), [])
+        nomes = {_normalizar_cabecalho(c) for c in primeira}
+        cabecalho = any(nomes & sinonimos for sinonimos in SINONIMOS.values())
+        if not cabecalho:
+            try:
+                cabecalho = csv.Sniffer().has_header(amostra)
+            except csv.Error:
+                cabecalho = False
+
+    return encoding, delimitador, cabecalho
+
+
+def montar_mapa_colunas(primeira_linha, tem_cabecalho, especificacao=None):
+    """
+    Define o índice de cada campo (nome, matricula, email) na linha do CSV.
+
+    `especificacao` é um texto como 'nome=1,matricula=2,email=3', com índices
+    a partir de zero ou nomes de colunas do cabeçalho. Sem ela, o mapa vem do
+    cabeçalho ou da quantidade de colunas: 3 colunas são nome,matricula,email
+    (formato do upload de inscrições) e 4 são id,nome,matricula,email
+    (formato do cadastro geral e da planilha de eventos do IFF).
+    Levanta ValueError se algum campo não puder ser localizado.
+    """
+    cabecalho = [_normalizar_cabecalho(c) for c in primeira_linha] if tem_cabecalho else []
+    mapa = {}
+
+    if especificacao:
+        for item in especificacao.split(','):
+            campo, _, coluna = item.partition('=')
+            campo, coluna = campo.strip(), coluna.strip()
+            if campo not in CAMPOS or not coluna:
+                raise ValueError(f"Mapeamento inválido: '{item}'. Use por exemplo nome=0,matricula=1,email=2.")
+            if coluna.isdigit():
+                mapa[campo] = int(coluna)
+            elif _normalizar_cabecalho(coluna) in cabecalho:
+                mapa[campo] = cabecalho.index(_normalizar_cabecalho(coluna))
+            else:
+                raise ValueError(f"Coluna '{coluna}' não encontrada no cabeçalho.")
+    elif cabecalho:
+        for campo, sinonimos in SINONIMOS.items():
+            for indice, nome in enumerate(cabecalho):
+                if nome in sinonimos:
+                    mapa[campo] = indice
+                    break
+    elif len(primeira_linha) == 3:
+        mapa = {'nome': 0, 'matricula': 1, 'email': 2}
+    elif len(primeira_linha) >= 4:
+        mapa = {'nome': 1, 'matricula': 2, 'email': 3}
+
+    faltando = [campo for campo in CAMPOS if campo not in mapa]
+    if faltando:
+        raise ValueError(f"Não foi possível localizar as colunas: {', '.join(faltando)}. Informe o mapeamento.")
+    return mapa
+
+
+def _validar(linha, mapa, apenas_matricula):
+    """Extrai (nome, matricula, email) da linha ou levanta ValueError com o motivo."""
+    try:
+        nome, matricula, email = (linha[mapa[campo]].strip() for campo in CAMPOS)
+    except IndexError:
+        raise ValueError("quantidade de colunas insuficiente")
+    if not matricula:
+        raise ValueError("matrícula vazia")
+    if not apenas_matricula:
+        if not nome or not email:
+            raise ValueError("campos vazios")
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise ValueError(f"e-mail inválido ({email})")
+    return nome, matricula, email
+
+
+def _indice_participantes(matriculas=None):
+    """
+    Retorna {matricula: [id, hash_conteudo, ativo]} da base inteira ou só das
+    matrículas informadas. Apenas três colunas curtas por participante, o que
+    permite manter em memória mesmo listas com dezenas de milhares de alunos.
+    """
+    participantes = Participante.objects.all()
+    if matriculas is not None:
+        participantes = participantes.filter(matricula__in=matriculas)
+    linhas = participantes.values_list('matricula', 'id', 'hash_conteudo', 'ativo').iterator(chunk_size=5000)
+    return {matricula: [pk, hash_conteudo, ativo] for matricula, pk, hash_conteudo, ativo in linhas}
+
+
+def _gravar_participantes(registros, indice):
+    """
+    Cria ou atualiza em lote os participantes, comparando o hash de cada linha
+    com o do `indice` (que é atualizado). Linhas idênticas ao cadastro não
+    geram escrita. Retorna (criados, atualizados, inalterados).
+    """
+    # Se a matrícula se repetir no lote, vale a última ocorrência
+    por_matricula = {matricula: (nome, email) for _, nome, matricula, email in registros}
+
+    novos, alterados = [], []
+    for matricula, (nome, email) in por_matricula.items():
+        hash_conteudo = calcular_hash_conteudo(nome, matricula, email)
+        atual = indice.get(matricula)
+        if atual is None:
+            participante = Participante(nome=nome, matricula=matricula, email=email, hash_conteudo=hash_conteudo)
+            # bulk_create não chama save(), então o QR Code é gerado aqui
+            participante.gerar_e_salvar_qrcode()
+            novos.append(participante)
+        elif atual[1] != hash_conteudo or not atual[2]:
+            alterados.append(Participante(
+                pk=atual[0], nome=nome, matricula=matricula, email=email,
+                hash_conteudo=hash_conteudo, ativo=True,
+            ))
+
+    Participante.objects.bulk_create(novos)
+    Participante.objects.bulk_update(alterados, ['nome', 'email', 'hash_conteudo', 'ativo'])
+    if novos or alterados:
+        # Operações em lote não disparam sinais
+        registrar_alteracao_ao_confirmar(participantes=True)
+    for participante in novos + alterados:
+        indice[participante.matricula] = [participante.pk, participante.hash_conteudo, True]
+    return len(novos), len(alterados), len(por_matricula) - len(novos) - len(alterados)
+
+
+def _tratar_ausentes(indice, vistas, ausentes, resumo, validas, rejeitadas):
+    """
+    Relata ou desativa os participantes ativos que não vieram na nova lista.
+
+    `vistas` inclui as matrículas das linhas rejeitadas. Mesmo assim, a
+    desativação é recusada (os ausentes são apenas relatados) se nenhuma
+    linha foi aceita ou se alguma foi rejeitada: um arquivo no formato errado
+    ou com linhas quebradas não pode desativar a base inteira. O motivo fica
+    em resumo['desativacao_recusada'].
+    """
+    faltando = [matricula for matricula, (_, _, ativo) in indice.items() if ativo and matricula not in vistas]
+    resumo['ausentes'] = faltando
+    if ausentes != 'desativar' or not faltando:
+        return
+    if not validas:
+        resumo['desativacao_recusada'] = "nenhuma linha válida no arquivo"
+        return
+    if rejeitadas:
+        resumo['desativacao_recusada'] = f"{rejeitadas} linhas rejeitadas no arquivo"
+        return
+    for lote in em_lotes(faltando, TAMANHO_LOTE):
+        resumo['desativados'] += Participante.objects.filter(matricula__in=lote).update(ativo=False)
+    registrar_alteracao_ao_confirmar(participantes=True)
+
+
+def sincronizar_participantes(registros, ausentes=None, tamanho_lote=TAMANHO_LOTE, rejeitadas=()):
+    """
+    Sincroniza a lista geral com `registros`, um iterável de tuplas
+    (numero_linha, nome, matricula, email). Só as linhas novas ou com hash
+    diferente do cadastrado são gravadas, então reenviar uma lista sem
+    mudanças praticamente não escreve no banco.
+
+    `ausentes` define o que fazer com quem está ativo na base mas não veio na
+    lista: None ignora, 'relatar' apenas lista as matrículas em
+    resumo['ausentes'] e 'desativar' também marca esses participantes como inativos.
+
+    `rejeitadas` traz as matrículas (ou None, se ilegíveis) das linhas que o
+    chamador recusou; elas contam como vistas e impedem a desativação.
+    """
+    indice = _indice_participantes()
+    vistas = {matricula for matricula in rejeitadas if matricula}
+    validas = 0
+    resumo = {
+        'criados': 0, 'atualizados': 0, 'inalterados': 0,
+        'ausentes': [], 'desativados': 0, 'desativacao_recusada': None,
+    }
+    for lote in em_lotes(registros, tamanho_lote):
+        vistas.update(matricula for _, _, matricula, _ in lote)
+        validas += len(lote)
+        with transaction.atomic():
+            criados, atualizados, inalterados = _gravar_participantes(lote, indice)
+        resumo['criados'] += criados
+        resumo['atualizados'] += atualizados
+        resumo['inalterados'] += inalterados
+    if ausentes:
+        _tratar_ausentes(indice, vistas, ausentes, resumo, validas, len(rejeitadas))
+    return resumo
+
+
+def _gravar_inscricoes(registros, evento, ao_rejeitar):
+    """Inscreve em lote no evento. Retorna (novas inscrições, já inscritos)."""
+    matriculas = {matricula for _, _, matricula, _ in registros}
+    ids = dict(Participante.objects.filter(matricula__in=matriculas).values_list('matricula', 'id'))
+    for numero, nome, matricula, email in registros:
+        if matricula not in ids:
+            ao_rejeitar(numero, "matrícula não encontrada no cadastro geral", [nome, matricula, email])
+
+    ja_inscritos = set(
+        Inscricao.objects.filter(evento=evento, participante_id__in=ids.values())
+        .values_list('participante_id', flat=True)
+    )
+    novas = [Inscricao(evento=evento, participante_id=pid) for pid in set(ids.values()) - ja_inscritos]
+    Inscricao.objects.bulk_create(novas, ignore_conflicts=True)
+    # bulk_create não dispara sinais; a ocupação e as listas do evento mudaram
+    registrar_alteracao_ao_confirmar([evento.id])
+    return len(novas), len(ja_inscritos)
+
+
+def importar_csv(
+    caminho, evento=None, cadastrar=True, mapa=None, encoding=None, delimitador=None,
+    cabecalho=None, tamanho_lote=TAMANHO_LOTE, ao_rejeitar=None, ao_concluir_lote=None,
+    sincronizar=False, ausentes=None,
+):
+    """
+    Lê o CSV em fluxo e grava em lotes. Com `cadastrar=True` os participantes
+    são criados/atualizados; com `evento` eles também são inscritos nele.
+
+    Com `sincronizar=True` o arquivo é tratado como a lista geral completa: o
+    índice de hashes da base inteira é carregado uma única vez (em vez de uma
+    consulta por lote) e `ausentes` funciona como em `sincronizar_participantes`.
+
+    `ao_rejeitar(numero_linha, motivo, linha)` é chamado para cada linha
+    recusada e `ao_concluir_lote(resumo)` após cada lote gravado.
+    Retorna o dicionário de resumo com os totais.
+    """
+    ao_rejeitar = ao_rejeitar or (lambda numero, motivo, linha: None)
+    encoding, delimitador, cabecalho = detectar_formato(caminho, encoding, delimitador, cabecalho)
+    resumo = {
+        'linhas': 0, 'rejeitadas': 0, 'criados': 0, 'atualizados': 0, 'inalterados': 0,
+        'inscritos': 0, 'ja_inscritos': 0, 'ausentes': [], 'desativados': 0, 'desativacao_recusada': None,
+    }
+    indice = _indice_participantes() if sincronizar else None
+    vistas = set()
+
+    with open(caminho, encoding=encoding, errors='importacao_cp1252', newline='') as f:
+        leitor = csv.reader(f, delimiter=delimitador)
+        primeira = next(leitor, None)
+        if primeira is None:
+            return resumo
+        colunas = montar_mapa_colunas(primeira, cabecalho, mapa)
+
+        def registros_validos():
+            linhas = enumerate(leitor, start=2)
+            if not cabecalho:
+                linhas = itertools.chain([(1, primeira)], linhas)
+            for numero, linha in linhas:
+                if not any(campo.strip() for campo in linha):
+                    continue
+                resumo['linhas'] += 1
+                try:
+                    yield (numero, *_validar(linha, colunas, apenas_matricula=not cadastrar))
+                except ValueError as e:
+                    resumo['rejeitadas'] += 1
+                    if len(linha) > colunas['matricula']:
+                        vistas.add(linha[colunas['matricula']].strip())
+                    ao_rejeitar(numero, str(e), linha)
+
+        def rejeitar_inscricao(numero, motivo, linha):
+            resumo['rejeitadas'] += 1
+            ao_rejeitar(numero, motivo, linha)
+
+        for lote in em_lotes(registros_validos(), tamanho_lote):
+            with transaction.atomic():
+                if cadastrar:
+                    matriculas = {matricula for _, _, matricula, _ in lote}
+                    if sincronizar:
+                        vistas.update(matriculas)
+                    criados, atualizados, inalterados = _gravar_participantes(
+                        lote, indice if sincronizar else _indice_participantes(matriculas),
+                    )
+                    resumo['criados'] += criados
+                    resumo['atualizados'] += atualizados
+                    resumo['inalterados'] += inalterados
+                if evento is not None:
+                    inscritos, ja_inscritos = _gravar_inscricoes(lote, evento, rejeitar_inscricao)
+                    resumo['inscritos'] += inscritos
+                    resumo['ja_inscritos'] += ja_inscritos
+            if ao_concluir_lote:
+                ao_concluir_lote(resumo)
+
+    if sincronizar and cadastrar and ausentes:
+        validas = resumo['linhas'] - resumo['rejeitadas']
+        _tratar_ausentes(indice, vistas, ausentes, resumo, validas, resumo['rejeitadas'])
+    return resumo
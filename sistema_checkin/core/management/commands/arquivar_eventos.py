@@ -0,0 +1,86 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.arquivamento import arquivar_eventos, compactar_banco_principal, restaurar_evento
+from core.models import EventoArquivado
+
+
+class Command(BaseCommand):
+    help = (
+        "Move eventos encerrados e suas inscrições para o banco de arquivo ('arquivo.sqlite3'), "
+        "ou restaura eventos arquivados com --restaurar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=90,
+            help="Arquiva eventos que ocorreram há mais de N dias (padrão: 90).",
+        )
+        parser.add_argument(
+            '--antes-de', help="Arquiva eventos anteriores a esta data (AAAA-MM-DD); substitui --dias.",
+        )
+        parser.add_argument(
+            '--simular', action='store_true',
+            help="Apenas lista o que seria arquivado, sem alterar nenhum banco.",
+        )
+        parser.add_argument(
+            '--restaurar', type=int, nargs='+', metavar='ID_EVENTO',
+            help="Devolve os eventos arquivados informados ao banco principal.",
+        )
+        parser.add_argument(
+            '--compactar', action='store_true',
+            help="Executa VACUUM no banco principal após arquivar, devolvendo o espaço em disco.",
+        )
+
+    def handle(self, *args, **options):
+        if options['restaurar']:
+            self._restaurar(options['restaurar'], options['simular'])
+            return
+
+        if options['antes_de']:
+            try:
+                dia = datetime.date.fromisoformat(options['antes_de'])
+            except ValueError:
+                raise CommandError("--antes-de deve estar no formato AAAA-MM-DD.")
+            antes_de = timezone.make_aware(datetime.datetime.combine(dia, datetime.time.min))
+        else:
+            antes_de = timezone.now() - datetime.timedelta(days=options['dias'])
+
+        resultado = arquivar_eventos(antes_de, simular=options['simular'])
+        verbo = "Seria arquivado" if options['simular'] else "Arquivado"
+        for evento, inscricoes in resultado:
+            self.stdout.write(f"{verbo}: {evento.nome} ({timezone.localtime(evento.data):%d/%m/%Y}) - {inscricoes} inscrições")
+
+        total_inscricoes = sum(inscricoes for _, inscricoes in resultado)
+        if options['simular']:
+            self.stdout.write(self.style.WARNING(
+                f"Simulação: {len(resultado)} eventos e {total_inscricoes} inscrições seriam arquivados."
+            ))
+            return
+
+        if options['compactar'] and resultado:
+            compactar_banco_principal()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(resultado)} eventos e {total_inscricoes} inscrições movidos para o arquivo."
+        ))
+
+    def _restaurar(self, ids, simular):
+        for evento_id in ids:
+            try:
+                if simular:
+                    arquivado = EventoArquivado.objects.get(id=evento_id)
+                    self.stdout.write(
+                        f"Seria restaurado: {arquivado.nome} - {arquivado.inscricoes.count()} inscrições"
+                    )
+                    continue
+                evento, restauradas, descartadas = restaurar_evento(evento_id)
+            except EventoArquivado.DoesNotExist:
+                raise CommandError(f"Evento {evento_id} não está no arquivo.")
+
+            self.stdout.write(self.style.SUCCESS(f"Restaurado: {evento.nome} - {restauradas} inscrições"))
+            if descartadas:
+                self.stdout.write(self.style.WARNING(
+                    f"{descartadas} inscrições descartadas: os participantes não existem mais na base."
+                ))
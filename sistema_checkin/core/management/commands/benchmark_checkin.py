@@ -0,0 +1,137 @@
+import http.client
+import json
+import random
+import ssl
+import statistics
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Evento, Inscricao, Participante
+from core.qrcodes import codificar_compacto
+
+
+def _percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, round(p / 100 * (len(valores_ordenados) - 1)))
+    return valores_ordenados[indice]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede requisições/segundo e latência (p50/p95/p99) de api_checkin e api_checkin_async com N totens "
+        "simultâneos. Usa um evento e participantes temporários, criados no banco do servidor e "
+        "apagados ao final. O servidor precisa estar rodando, com o mesmo banco, por exemplo: "
+        "uvicorn sistema_checkin.asgi:application --port 8000"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Endereço do servidor (padrão: http://127.0.0.1:8000).")
+        parser.add_argument(
+            '--participantes', type=int, default=2000,
+            help="Participantes temporários sorteados nas leituras (padrão: 2000).",
+        )
+        parser.add_argument('--totens', type=int, default=20, help="Totens (conexões) simultâneos (padrão: 20).")
+        parser.add_argument('--duracao', type=float, default=10, help="Segundos de carga por endpoint (padrão: 10).")
+        parser.add_argument(
+            '--endpoints', default='api_checkin,api_checkin_async',
+            help="Rotas a comparar, separadas por vírgula (padrão: api_checkin,api_checkin_async).",
+        )
+
+    def handle(self, *args, **options):
+        if options['participantes'] < 1:
+            raise CommandError("--participantes deve ser maior que zero.")
+
+        # Nada de eventos ou participantes reais: as leituras gravam presenças
+        marcador = uuid.uuid4().hex[:8]
+        prefixo_matricula = f'benchmark-{marcador}-'
+        evento = Evento.objects.create(
+            nome=f'Benchmark de check-in {marcador}', data=timezone.now(), vagas=options['participantes'],
+        )
+        # bulk_create não chama save(): não gera imagens de QR Code no disco
+        participantes = Participante.objects.bulk_create([
+            Participante(
+                nome=f'Benchmark {marcador} {i}', matricula=f'{prefixo_matricula}{i}',
+                email=f'benchmark{i}@exemplo.invalid',
+            )
+            for i in range(options['participantes'])
+        ])
+        qr_codes = [codificar_compacto(participante.id_unico_qr) for participante in participantes]
+
+        try:
+            self.stdout.write(
+                f"Evento temporário '{evento.nome}', {options['totens']} totens, "
+                f"{options['duracao']:.0f}s por endpoint, {len(qr_codes)} QR Codes sorteados."
+            )
+            self.stdout.write(
+                f"{'endpoint':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'máx ms':>10}{'erros':>8}"
+            )
+            for nome_rota in options['endpoints'].split(','):
+                # Cada endpoint começa sem nenhuma presença registrada, para
+                # que todos meçam a mesma mistura de primeiras leituras e repetidas
+                Inscricao.objects.filter(evento=evento).delete()
+                caminho = reverse(nome_rota.strip(), args=[evento.id])
+                resultado = self._medir(options['url'], caminho, qr_codes, options['totens'], options['duracao'])
+                self.stdout.write(
+                    f"{nome_rota.strip():<20}{resultado['rps']:>10.1f}{resultado['p50']:>10.1f}"
+                    f"{resultado['p95']:>10.1f}{resultado['p99']:>10.1f}{resultado['max']:>10.1f}{resultado['erros']:>8}"
+                )
+        finally:
+            evento.delete()
+            Participante.objects.filter(matricula__startswith=prefixo_matricula).delete()
+
+    def _medir(self, url_base, caminho, qr_codes, totens, duracao):
+        url = urlsplit(url_base)
+        latencias, erros = [], [0]
+        trava = threading.Lock()
+        fim = time.perf_counter() + duracao
+
+        def totem():
+            if url.scheme == 'https':
+                # Certificado local autoassinado (runserver_plus)
+                conexao = http.client.HTTPSConnection(url.hostname, url.port, context=ssl._create_unverified_context())
+            else:
+                conexao = http.client.HTTPConnection(url.hostname, url.port)
+            minhas, meus_erros = [], 0
+            while time.perf_counter() < fim:
+                corpo = json.dumps({'id_unico_qr': random.choice(qr_codes)})
+                inicio = time.perf_counter()
+                try:
+                    conexao.request('POST', caminho, corpo, {'Content-Type': 'application/json'})
+                    resposta = conexao.getresponse()
+                    resposta.read()
+                    if resposta.status >= 500:
+                        meus_erros += 1
+                    else:
+                        minhas.append((time.perf_counter() - inicio) * 1000)
+                except (OSError, http.client.HTTPException):
+                    meus_erros += 1
+                    conexao.close()
+            conexao.close()
+            with trava:
+                latencias.extend(minhas)
+                erros[0] += meus_erros
+
+        threads = [threading.Thread(target=totem) for _ in range(totens)]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        decorrido = time.perf_counter() - inicio
+
+        latencias.sort()
+        return {
+            'rps': len(latencias) / decorrido,
+            'p50': statistics.median(latencias) if latencias else 0.0,
+            'p95': _percentil(latencias, 95),
+            'p99': _percentil(latencias, 99),
+            'max': latencias[-1] if latencias else 0.0,
+            'erros': erros[0],
+        }
@@ -0,0 +1,131 @@
+import random
+import statistics
+import time
+import uuid
+
+import qrcode
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, ImageDraw, ImageFilter
+
+from core import qrcodes
+from core.management.commands.benchmark_checkin import _percentil
+
+# Quadro de câmera simulado (resolução típica de webcam barata em modo de pré-visualização)
+LARGURA_QUADRO = 320
+ALTURA_QUADRO = 240
+
+
+def _simbolo(formato, id_unico_qr):
+    """Retorna (conteúdo, imagem em tons de cinza, versão) no formato pedido."""
+    if formato == 'legado':
+        # Exatamente como Participante.gerar_e_salvar_qrcode fazia antes
+        conteudo = str(id_unico_qr)
+        qr = qrcode.QRCode()
+        qr.add_data(conteudo)
+        qr.make(fit=True)
+    else:
+        conteudo = qrcodes.codificar_compacto(id_unico_qr)
+        qr = qrcodes.montar_qrcode(conteudo)
+    return conteudo, qr.make_image().get_image().convert('L'), qr.version
+
+
+def _capturar(imagem, lado, desfoque, reflexo, sorteio):
+    """
+    Simula um quadro da câmera do totem: o QR ocupa `lado` pixels numa posição
+    sorteada, com desfoque gaussiano, um reflexo claro (tela de celular) e ruído.
+    """
+    quadro = Image.new('L', (LARGURA_QUADRO, ALTURA_QUADRO), 110)
+    x = sorteio.randint(0, LARGURA_QUADRO - lado)
+    y = sorteio.randint(0, ALTURA_QUADRO - lado)
+    quadro.paste(imagem.resize((lado, lado), Image.BILINEAR), (x, y))
+
+    if reflexo:
+        mancha = Image.new('L', quadro.size, 0)
+        raio = lado // 3
+        cx, cy = x + sorteio.randint(0, lado), y + sorteio.randint(0, lado)
+        ImageDraw.Draw(mancha).ellipse([cx - raio, cy - raio, cx + raio, cy + raio], fill=int(255 * reflexo))
+        mancha = mancha.filter(ImageFilter.GaussianBlur(raio / 2))
+        quadro = Image.composite(Image.new('L', quadro.size, 255), quadro, mancha)
+
+    if desfoque:
+        quadro = quadro.filter(ImageFilter.GaussianBlur(desfoque * sorteio.uniform(0.7, 1.3)))
+    ruido = Image.effect_noise(quadro.size, 12)
+    return Image.blend(quadro, ruido, 0.08)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o tempo de decodificação e a taxa de leitura do QR Code legado (UUID com hífens) "
+        "e do compacto em quadros de câmera simulados (baixa resolução, desfoque e reflexo). "
+        "Requer o OpenCV: pip install opencv-python-headless"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--amostras', type=int, default=100, help="QR Codes gerados por formato (padrão: 100).")
+        parser.add_argument(
+            '--quadros', type=int, default=10,
+            help="Quadros tentados por QR Code antes de desistir, como o totem a 10 fps em 1s (padrão: 10).",
+        )
+        parser.add_argument(
+            '--lado', type=int, default=80,
+            help="Tamanho, em pixels, que o QR ocupa no quadro de 320x240 (padrão: 80).",
+        )
+        parser.add_argument('--desfoque', type=float, default=0.8, help="Raio do desfoque gaussiano (padrão: 0.8).")
+        parser.add_argument('--reflexo', type=float, default=0.6, help="Intensidade do reflexo, de 0 a 1 (padrão: 0.6).")
+        parser.add_argument('--semente', type=int, default=42, help="Semente dos sorteios, para repetir a medição.")
+
+    def handle(self, *args, **options):
+        try:
+            import cv2
+            import numpy as np
+        except ImportError:
+            raise CommandError("O OpenCV não está instalado. Instale com: pip install opencv-python-headless")
+
+        detector = cv2.QRCodeDetector()
+        sorteio_ids = random.Random(options['semente'])
+        ids = [uuid.UUID(int=sorteio_ids.getrandbits(128), version=4) for _ in range(options['amostras'])]
+
+        self.stdout.write(
+            f"{options['amostras']} QR Codes por formato, até {options['quadros']} quadros cada, "
+            f"QR com {options['lado']}px em {LARGURA_QUADRO}x{ALTURA_QUADRO}."
+        )
+        self.stdout.write(
+            f"{'formato':<10}{'versão':>8}{'módulos':>9}{'lidos':>8}{'quadros':>9}"
+            f"{'ms/quadro':>11}{'p95 ms':>9}{'ms até ler':>12}"
+        )
+
+        for formato in ('legado', 'compacto'):
+            # Mesma semente nos dois formatos: as mesmas posições, reflexos e desfoques
+            sorteio = random.Random(options['semente'])
+            tempos, quadros_ate_ler, tempos_ate_ler = [], [], []
+            versao = modulos = 0
+            for id_unico_qr in ids:
+                conteudo, imagem, versao = _simbolo(formato, id_unico_qr)
+                modulos = 17 + 4 * versao
+                acumulado = 0.0
+                for quadro in range(1, options['quadros'] + 1):
+                    pixels = np.asarray(
+                        _capturar(imagem, options['lado'], options['desfoque'], options['reflexo'], sorteio)
+                    )
+                    inicio = time.perf_counter()
+                    lido, _, _ = detector.detectAndDecode(pixels)
+                    decorrido = (time.perf_counter() - inicio) * 1000
+                    tempos.append(decorrido)
+                    acumulado += decorrido
+                    if lido == conteudo:
+                        quadros_ate_ler.append(quadro)
+                        tempos_ate_ler.append(acumulado)
+                        break
+
+            tempos.sort()
+            lidos = len(quadros_ate_ler)
+            self.stdout.write(
+                f"{formato:<10}{versao:>8}{modulos:>9}{lidos / len(ids):>8.0%}"
+                f"{statistics.mean(quadros_ate_ler) if lidos else 0:>9.2f}"
+                f"{statistics.mean(tempos):>11.2f}{_percentil(tempos, 95):>9.2f}"
+                f"{statistics.mean(tempos_ate_ler) if lidos else 0:>12.2f}"
+            )
+        self.stdout.write(
+            "lidos: QR Codes decodificados dentro do limite de quadros; quadros: média de quadros até a "
+            "primeira leitura; ms até ler: tempo de decodificação somado até a primeira leitura."
+        )
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.exportacao import TAMANHO_LOTE, exportar_parquet
+
+
+class Command(BaseCommand):
+    help = "Exporta eventos, participantes e inscrições em arquivos Parquet particionados pelo dia do evento."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'destino', nargs='?', default=settings.EXPORTACAO_PARQUET_DIR,
+            help="Diretório de saída (padrão: settings.EXPORTACAO_PARQUET_DIR).",
+        )
+        parser.add_argument(
+            '--completo', action='store_true',
+            help="Regera todas as partições em vez de exportar apenas os eventos alterados.",
+        )
+        parser.add_argument(
+            '--lote', type=int, default=TAMANHO_LOTE,
+            help=f"Linhas lidas do banco e gravadas por arquivo (padrão: {TAMANHO_LOTE}).",
+        )
+
+    def handle(self, *args, **options):
+        resumo = exportar_parquet(options['destino'], completo=options['completo'], tamanho_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Exportação concluída em '{options['destino']}': "
+            f"{resumo['eventos_alterados']} eventos alterados, {resumo['dias_reescritos']} dias reescritos, "
+            f"{resumo['inscricoes_exportadas']} inscrições e {resumo['participantes_exportados']} participantes."
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.crachas import COLUNAS_PADRAO, LINHAS_PADRAO, dados_crachas, gerar_pdf_crachas
+from core.models import Evento
+
+
+class Command(BaseCommand):
+    help = "Gera folhas de crachás (nome, CPF e QR Code) em PDF para os inscritos de um evento ou para toda a base."
+
+    def add_arguments(self, parser):
+        parser.add_argument('saida', help="Caminho do PDF a ser gerado.")
+        parser.add_argument('--evento', type=int, help="ID do evento; sem ele, gera para todos os participantes.")
+        parser.add_argument('--colunas', type=int, default=COLUNAS_PADRAO, help="Crachás por linha da página.")
+        parser.add_argument('--linhas', type=int, default=LINHAS_PADRAO, help="Linhas de crachás por página.")
+        parser.add_argument('--processos', type=int, help="Processos de renderização (padrão: número de CPUs).")
+
+    def handle(self, *args, **options):
+        evento = None
+        if options['evento']:
+            try:
+                evento = Evento.objects.get(id=options['evento'])
+            except Evento.DoesNotExist:
+                raise CommandError(f"Evento {options['evento']} não encontrado.")
+
+        if options['colunas'] < 1 or options['linhas'] < 1:
+            raise CommandError("--colunas e --linhas devem ser maiores que zero.")
+
+        total_bytes = 0
+        with open(options['saida'], 'wb') as f:
+            for parte in gerar_pdf_crachas(
+                dados_crachas(evento),
+                colunas=options['colunas'],
+                linhas=options['linhas'],
+                processos=options['processos'],
+            ):
+                f.write(parte)
+                total_bytes += len(parte)
+
+        self.stdout.write(self.style.SUCCESS(f"Crachás gravados em '{options['saida']}' ({total_bytes // 1024} KB)."))
@@ -0,0 +1,133 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.importacao import TAMANHO_LOTE, importar_csv
+from core.models import Evento
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa um CSV de qualquer tamanho para o cadastro geral e/ou as inscrições de um evento. "
+        "Substitui o script Processar_CSV_eventosIFF.py e os limites de tamanho do upload pelo site."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help="Caminho do arquivo CSV.")
+        parser.add_argument('--evento', type=int, help="ID do evento em que os participantes serão inscritos.")
+        parser.add_argument(
+            '--apenas-inscrever', action='store_true',
+            help="Não cria nem atualiza participantes; só inscreve no --evento os que já estão cadastrados.",
+        )
+        parser.add_argument(
+            '--colunas',
+            help="Mapeamento das colunas, por índice (a partir de 0) ou nome no cabeçalho. "
+                 "Ex.: 'nome=1,matricula=2,email=3' ou 'nome=Nome Completo,matricula=CPF,email=E-mail'.",
+        )
+        parser.add_argument('--delimitador', help="Delimitador do CSV (padrão: detectado automaticamente).")
+        parser.add_argument('--encoding', help="Encoding do arquivo (padrão: UTF-8, com recurso a cp1252).")
+        cabecalho = parser.add_mutually_exclusive_group()
+        cabecalho.add_argument(
+            '--cabecalho', dest='cabecalho', action='store_true', default=None,
+            help="A primeira linha é cabeçalho.",
+        )
+        cabecalho.add_argument(
+            '--sem-cabecalho', dest='cabecalho', action='store_false',
+            help="A primeira linha já contém dados.",
+        )
+        parser.add_argument(
+            '--sincronizar', action='store_true',
+            help="Trata o arquivo como a lista geral completa: compara o hash de cada linha com o cadastro "
+                 "e só grava as linhas novas ou alteradas.",
+        )
+        parser.add_argument(
+            '--ausentes', choices=['relatar', 'desativar'],
+            help="Com --sincronizar, relata ou desativa os participantes que não estão no arquivo.",
+        )
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help=f"Linhas por lote gravado (padrão: {TAMANHO_LOTE}).")
+        parser.add_argument(
+            '--relatorio',
+            help="Prefixo dos arquivos de relatório (padrão: o próprio caminho do CSV). São gerados "
+                 "'<prefixo>.rejeitados.csv' e '<prefixo>.progresso.log'.",
+        )
+
+    def handle(self, *args, **options):
+        evento = None
+        if options['evento']:
+            try:
+                evento = Evento.objects.get(id=options['evento'])
+            except Evento.DoesNotExist:
+                raise CommandError(f"Evento {options['evento']} não encontrado.")
+        if options['apenas_inscrever'] and evento is None:
+            raise CommandError("--apenas-inscrever exige --evento.")
+        if options['ausentes'] and not options['sincronizar']:
+            raise CommandError("--ausentes exige --sincronizar.")
+        if options['sincronizar'] and options['apenas_inscrever']:
+            raise CommandError("--sincronizar não pode ser usado com --apenas-inscrever.")
+
+        prefixo = options['relatorio'] or options['arquivo']
+        caminho_rejeitados = f'{prefixo}.rejeitados.csv'
+        caminho_progresso = f'{prefixo}.progresso.log'
+
+        with open(caminho_rejeitados, 'w', newline='', encoding='utf-8-sig') as f_rejeitados, \
+             open(caminho_progresso, 'w', encoding='utf-8') as f_progresso:
+            escritor = csv.writer(f_rejeitados)
+            escritor.writerow(['linha', 'motivo', 'conteudo'])
+
+            def ao_rejeitar(numero, motivo, linha):
+                escritor.writerow([numero, motivo, *linha])
+
+            def ao_concluir_lote(resumo):
+                mensagem = (
+                    f"{timezone.localtime():%d/%m/%Y %H:%M:%S} - {resumo['linhas']} linhas lidas, "
+                    f"{resumo['criados']} criados, {resumo['atualizados']} atualizados, "
+                    f"{resumo['inalterados']} inalterados, "
+                    f"{resumo['inscritos']} inscritos, {resumo['rejeitadas']} rejeitadas"
+                )
+                f_progresso.write(mensagem + '\n')
+                f_progresso.flush()
+                self.stdout.write(mensagem)
+
+            try:
+                resumo = importar_csv(
+                    options['arquivo'],
+                    evento=evento,
+                    cadastrar=not options['apenas_inscrever'],
+                    mapa=options['colunas'],
+                    encoding=options['encoding'],
+                    delimitador=options['delimitador'],
+                    cabecalho=options['cabecalho'],
+                    tamanho_lote=options['lote'],
+                    ao_rejeitar=ao_rejeitar,
+                    ao_concluir_lote=ao_concluir_lote,
+                    sincronizar=options['sincronizar'],
+                    ausentes=options['ausentes'],
+                )
+            except FileNotFoundError:
+                raise CommandError(f"O arquivo '{options['arquivo']}' não foi encontrado.")
+            except (ValueError, UnicodeDecodeError) as e:
+                raise CommandError(f"Erro ao ler o CSV: {e}")
+
+            if resumo['ausentes']:
+                f_progresso.write("Matrículas ausentes do arquivo:\n")
+                f_progresso.writelines(f"{matricula}\n" for matricula in resumo['ausentes'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Importação concluída: {resumo['criados']} criados, {resumo['atualizados']} atualizados, "
+            f"{resumo['inalterados']} inalterados, "
+            f"{resumo['inscritos']} novas inscrições, {resumo['ja_inscritos']} já inscritos."
+        ))
+        if resumo['ausentes']:
+            acao = "desativados" if resumo['desativados'] else "ausentes do arquivo"
+            self.stdout.write(self.style.WARNING(
+                f"{len(resumo['ausentes'])} participantes {acao}; veja '{caminho_progresso}'."
+            ))
+        if resumo['desativacao_recusada']:
+            self.stdout.write(self.style.ERROR(
+                f"Ninguém foi desativado: {resumo['desativacao_recusada']}. Corrija o arquivo e importe de novo."
+            ))
+        if resumo['rejeitadas']:
+            self.stdout.write(self.style.WARNING(
+                f"{resumo['rejeitadas']} linhas rejeitadas; veja '{caminho_rejeitados}'."
+            ))
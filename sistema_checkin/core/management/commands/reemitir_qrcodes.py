@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from core.emails import enviar_qr_codes_em_lote
+from core.models import Participante
+from core.utils import em_lotes
+from core.versoes import registrar_alteracao
+
+
+class Command(BaseCommand):
+    help = (
+        "Regera no formato compacto as imagens de QR Code ainda no formato legado (UUID com hífens). "
+        "O identificador do participante não muda, então crachás já impressos continuam válidos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--todos', action='store_true',
+            help="Regera também as imagens que já estão no formato compacto.",
+        )
+        parser.add_argument(
+            '--enviar-email', action='store_true',
+            help="Envia por e-mail o novo QR Code a cada participante reemitido.",
+        )
+        parser.add_argument(
+            '--simular', action='store_true',
+            help="Apenas conta quantos QR Codes seriam reemitidos.",
+        )
+        parser.add_argument('--lote', type=int, default=500, help="Participantes gravados por vez (padrão: 500).")
+
+    def handle(self, *args, **options):
+        participantes = Participante.objects.all()
+        if not options['todos']:
+            participantes = participantes.filter(qr_compacto=False)
+        # A lista de ids é lida antes, pois o filtro muda à medida que as imagens são regravadas
+        ids = list(participantes.order_by('pk').values_list('pk', flat=True))
+
+        if options['simular']:
+            self.stdout.write(self.style.WARNING(f"Simulação: {len(ids)} QR Codes seriam reemitidos."))
+            return
+
+        reemitidos, enviados, falhas = 0, 0, []
+        for lote in em_lotes(ids, options['lote']):
+            participantes_lote = list(Participante.objects.in_bulk(lote).values())
+            for participante in participantes_lote:
+                participante.gerar_e_salvar_qrcode()
+            Participante.objects.bulk_update(participantes_lote, ['qr_code_img', 'qr_compacto'])
+            reemitidos += len(participantes_lote)
+
+            if options['enviar_email']:
+                enviados_lote, falhas_lote = enviar_qr_codes_em_lote(participantes_lote)
+                enviados += enviados_lote
+                falhas += falhas_lote
+            self.stdout.write(f"{reemitidos}/{len(ids)} QR Codes reemitidos...")
+
+        if reemitidos:
+            # bulk_update não dispara sinais; a lista geral mostra a imagem do QR Code
+            registrar_alteracao(participantes=True)
+        self.stdout.write(self.style.SUCCESS(f"{reemitidos} QR Codes reemitidos no formato compacto."))
+        if options['enviar_email']:
+            self.stdout.write(self.style.SUCCESS(f"{enviados} e-mails enviados."))
+            if falhas:
+                self.stdout.write(self.style.ERROR(f"Falha no envio para: {', '.join(falhas)}"))
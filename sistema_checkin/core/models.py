@@ -1,11 +1,27 @@
 import uuid
+import hashlib
 from django.db import models
 from django.core.files.base import ContentFile
 from io import BytesIO
-import qrcode
 from django.utils import timezone
 import re
 
+from . import qrcodes
+
+
+def calcular_hash_conteudo(nome, matricula, email):
+    """
+    Impressão digital dos dados cadastrais normalizados (espaços extras
+    removidos e e-mail em minúsculas). Usada pela sincronização da lista
+    geral para saber, sem comparar campo a campo, se uma linha mudou.
+    """
+    normalizado = '\x1f'.join((
+        ' '.join(nome.split()),
+        matricula.strip(),
+        email.strip().lower(),
+    ))
+    return hashlib.sha1(normalizado.encode('utf-8')).hexdigest()
+
 class Participante(models.Model):
     nome = models.CharField(max_length=200, verbose_name="Nome Completo")
     email = models.EmailField(verbose_name="E-mail")
@@ -18,28 +34,41 @@ class Participante(models.Model):
         blank=True, 
         verbose_name="Último Envio do E-mail"
     )
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, verbose_name="Hash do Cadastro")
+    ativo = models.BooleanField(default=True, verbose_name="Ativo")
+    qr_compacto = models.BooleanField(default=False, editable=False, verbose_name="QR Code no formato compacto")
     
     def __str__(self):
         return self.nome
 
+    @property
+    def conteudo_qr(self):
+        """Texto gravado no QR Code (formato compacto, ver core/qrcodes.py)."""
+        return qrcodes.codificar_compacto(self.id_unico_qr)
+
     def gerar_e_salvar_qrcode(self):
         """
         Gera um QR Code e define o nome do arquivo como 'nome_do_aluno_matricula.png'.
+        Se o participante já tinha uma imagem, ela é substituída.
         """
         buffer = BytesIO()
-        img = qrcode.make(str(self.id_unico_qr))
+        img = qrcodes.montar_qrcode(self.conteudo_qr).make_image()
         img.save(buffer, format='PNG')
         
         # Esta linha agora funcionará porque 're' foi importado
         nome_seguro = re.sub(r'\s+', '_', self.nome).lower()
         nome_arquivo = f'{nome_seguro}_{self.matricula}.png'
         
+        if self.qr_code_img:
+            self.qr_code_img.delete(save=False)
         self.qr_code_img.save(nome_arquivo, ContentFile(buffer.getvalue()), save=False)
+        self.qr_compacto = True
 
     def save(self, *args, **kwargs):
         # Gera o QR Code apenas na primeira vez que o participante é criado
         if not self.pk:
             self.gerar_e_salvar_qrcode()
+        self.hash_conteudo = calcular_hash_conteudo(self.nome, self.matricula, self.email)
         super().save(*args, **kwargs)
 
 
@@ -77,4 +106,41 @@ class Inscricao(models.Model):
         self.status = 'LISTA_ESPERA'
         self.data_checkin = None
         self.data_entrada_espera = timezone.now()
-        self.save()
\ No newline at end of file
+        self.save()
+
+# --- ARQUIVO DE EVENTOS ENCERRADOS ---
+# Estes modelos ficam no banco 'arquivo' (ver core/routers.py). Os dados do
+# participante são copiados para a inscrição arquivada porque não há chave
+# estrangeira entre bancos diferentes.
+
+class EventoArquivado(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    nome = models.CharField(max_length=255, verbose_name="Nome do Evento")
+    data = models.DateTimeField(verbose_name="Data e Hora", db_index=True)
+    vagas = models.PositiveIntegerField(default=0, verbose_name="Número de Vagas")
+    arquivado_em = models.DateTimeField(default=timezone.now, verbose_name="Arquivado em")
+
+    class Meta:
+        verbose_name = "Evento arquivado"
+        verbose_name_plural = "Eventos arquivados"
+
+    def __str__(self):
+        return self.nome
+
+class InscricaoArquivada(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    evento = models.ForeignKey(EventoArquivado, on_delete=models.CASCADE, related_name='inscricoes')
+    participante_id = models.BigIntegerField(db_index=True)
+    participante_nome = models.CharField(max_length=200, verbose_name="Nome Completo")
+    participante_matricula = models.CharField(max_length=50, verbose_name="Matrícula")
+    participante_email = models.EmailField(verbose_name="E-mail")
+    status = models.CharField(max_length=20, choices=Inscricao.STATUS_CHOICES)
+    data_checkin = models.DateTimeField(null=True, blank=True, verbose_name="Data do Check-in")
+    data_entrada_espera = models.DateTimeField(null=True, blank=True, verbose_name="Entrada na Lista de Espera")
+
+    class Meta:
+        verbose_name = "Inscrição arquivada"
+        verbose_name_plural = "Inscrições arquivadas"
+
+    def __str__(self):
+        return f"{self.participante_nome} em {self.evento.nome} - {self.get_status_display()}"
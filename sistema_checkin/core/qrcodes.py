@@ -0,0 +1,60 @@
+"""
+Formatos do conteúdo dos QR Codes dos participantes.
+
+- Legado: o UUID com hífens ('3f2b...-...'), 36 caracteres em modo byte,
+  que gera um símbolo versão 3 (29x29 módulos).
+- Compacto: 'CK' seguido dos 16 bytes do UUID em base32 sem preenchimento,
+  28 caracteres só de letras maiúsculas e dígitos. O qrcode usa o modo
+  alfanumérico e o símbolo cabe na versão 2 (25x25) mesmo com correção de
+  erros nível Q, o que deixa os módulos maiores na câmera do totem.
+
+Os dois formatos identificam o mesmo `id_unico_qr`, então crachás antigos
+continuam valendo depois da reemissão. Este módulo não importa o Django,
+pois também é usado pelos processos que desenham os crachás.
+"""
+import base64
+import binascii
+import uuid
+
+import qrcode
+from qrcode.constants import ERROR_CORRECT_Q
+
+PREFIXO_COMPACTO = 'CK'
+TAMANHO_COMPACTO = len(PREFIXO_COMPACTO) + 26
+
+# Nível Q recupera até 25% do símbolo (reflexo na tela do celular) e a
+# borda de 4 módulos é a zona de silêncio mínima da norma.
+CORRECAO_ERROS = ERROR_CORRECT_Q
+BORDA = 4
+
+
+def codificar_compacto(id_unico_qr):
+    """Converte um UUID (ou sua representação em texto) para o formato compacto."""
+    if not isinstance(id_unico_qr, uuid.UUID):
+        id_unico_qr = uuid.UUID(str(id_unico_qr))
+    return PREFIXO_COMPACTO + base64.b32encode(id_unico_qr.bytes).decode('ascii').rstrip('=')
+
+
+def decodificar(conteudo):
+    """
+    Extrai o UUID de um conteúdo lido pela câmera, no formato compacto ou no
+    legado. Retorna None se o texto não estiver em nenhum dos dois.
+    """
+    conteudo = (conteudo or '').strip()
+    if len(conteudo) == TAMANHO_COMPACTO and conteudo[:len(PREFIXO_COMPACTO)].upper() == PREFIXO_COMPACTO:
+        try:
+            return uuid.UUID(bytes=base64.b32decode(conteudo[len(PREFIXO_COMPACTO):].upper() + '======'))
+        except (binascii.Error, ValueError):
+            return None
+    try:
+        return uuid.UUID(conteudo)
+    except ValueError:
+        return None
+
+
+def montar_qrcode(conteudo, box_size=10):
+    """QRCode já ajustado (versão mínima, nível Q, borda padrão) para o conteúdo."""
+    qr = qrcode.QRCode(error_correction=CORRECAO_ERROS, box_size=box_size, border=BORDA)
+    qr.add_data(conteudo)
+    qr.make(fit=True)
+    return qr
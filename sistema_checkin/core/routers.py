@@ -0,0 +1,34 @@
+"""
+Roteador de banco de dados: os modelos de arquivo (eventos encerrados e suas
+inscrições) vivem num arquivo SQLite separado, o banco 'arquivo', para que o
+banco principal contenha apenas os dados usados no dia a dia.
+"""
+
+MODELOS_ARQUIVO = {'eventoarquivado', 'inscricaoarquivada'}
+BANCO_ARQUIVO = 'arquivo'
+
+
+def _eh_modelo_arquivo(app_label, model_name):
+    return app_label == 'core' and model_name in MODELOS_ARQUIVO
+
+
+class ArquivoRouter:
+    def db_for_read(self, model, **hints):
+        if _eh_modelo_arquivo(model._meta.app_label, model._meta.model_name):
+            return BANCO_ARQUIVO
+        return None
+
+    def db_for_write(self, model, **hints):
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        arquivo1 = _eh_modelo_arquivo(obj1._meta.app_label, obj1._meta.model_name)
+        arquivo2 = _eh_modelo_arquivo(obj2._meta.app_label, obj2._meta.model_name)
+        return arquivo1 == arquivo2
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == BANCO_ARQUIVO:
+            return model_name is not None and _eh_modelo_arquivo(app_label, model_name)
+        if model_name is not None and _eh_modelo_arquivo(app_label, model_name):
+            return False
+        return None
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Participante, Evento, Inscricao
+from .versoes import registrar_alteracao_ao_confirmar
+
+
+# Numa transação, as versões de todas as linhas gravadas são acumuladas e
+# renovadas uma única vez no commit (ver versoes.registrar_alteracao_ao_confirmar).
+
+@receiver([post_save, post_delete], sender=Evento)
+def registrar_alteracao_evento(sender, instance, using, **kwargs):
+    """Datas, nome ou vagas do evento mudam o calendário e a página do evento."""
+    registrar_alteracao_ao_confirmar([instance.pk], using=using)
+
+
+@receiver([post_save, post_delete], sender=Inscricao)
+def registrar_alteracao_inscricao(sender, instance, using, **kwargs):
+    """Qualquer mudança numa inscrição altera a ocupação e as listas do evento."""
+    registrar_alteracao_ao_confirmar([instance.evento_id], using=using)
+
+
+@receiver([post_save, post_delete], sender=Participante)
+def registrar_alteracao_participante(sender, using, **kwargs):
+    """Nome, e-mail e situação aparecem na lista geral e nas listas dos eventos."""
+    registrar_alteracao_ao_confirmar(participantes=True, using=using)
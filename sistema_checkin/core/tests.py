@@ -1,3 +1,298 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.messages import get_messages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .arquivamento import arquivar_eventos, restaurar_evento
+from .crachas import _fonte, _renderizar_pagina
+from .exportacao import exportar_parquet
+from .importacao import sincronizar_participantes
+from . import qrcodes
+from .models import Participante, Evento, Inscricao, EventoArquivado, InscricaoArquivada, calcular_hash_conteudo
+from .routers import BANCO_ARQUIVO
+
+
+class ArquivamentoFalhaTests(TransactionTestCase):
+    """Uma falha ao confirmar a transação de um dos bancos não pode perder dados."""
+
+    databases = {'default', BANCO_ARQUIVO}
+
+    def setUp(self):
+        # bulk_create não chama save(): não gera imagens de QR Code no disco
+        participantes = Participante.objects.bulk_create([
+            Participante(nome=f'Aluno {i}', matricula=f'{i:011d}', email=f'aluno{i}@exemplo.com')
+            for i in range(3)
+        ])
+        self.evento = Evento.objects.create(nome='Palestra', data=timezone.now() - timezone.timedelta(days=200))
+        Inscricao.objects.bulk_create([Inscricao(evento=self.evento, participante=p) for p in participantes])
+
+    def test_falha_no_commit_do_arquivo_mantem_o_evento(self):
+        with mock.patch.object(
+            connections[BANCO_ARQUIVO], 'commit', side_effect=OperationalError('database is locked'),
+        ):
+            with self.assertRaises(OperationalError):
+                arquivar_eventos(timezone.now())
+
+        self.assertTrue(Evento.objects.filter(id=self.evento.id).exists())
+        self.assertEqual(Inscricao.objects.filter(evento=self.evento).count(), 3)
+        self.assertFalse(EventoArquivado.objects.exists())
+
+    def test_falha_no_commit_principal_permite_nova_tentativa(self):
+        with mock.patch.object(
+            connections['default'], 'commit', side_effect=OperationalError('database is locked'),
+        ):
+            with self.assertRaises(OperationalError):
+                arquivar_eventos(timezone.now())
+        self.assertEqual(Inscricao.objects.filter(evento=self.evento).count(), 3)
+
+        # A cópia que sobrou no arquivo é substituída na próxima execução
+        arquivar_eventos(timezone.now())
+        self.assertFalse(Evento.objects.exists())
+        self.assertEqual(InscricaoArquivada.objects.filter(evento_id=self.evento.id).count(), 3)
+
+    def test_falha_no_commit_principal_ao_restaurar_mantem_o_arquivo(self):
+        arquivar_eventos(timezone.now())
+        with mock.patch.object(
+            connections['default'], 'commit', side_effect=OperationalError('database is locked'),
+        ):
+            with self.assertRaises(OperationalError):
+                restaurar_evento(self.evento.id)
+
+        self.assertFalse(Evento.objects.exists())
+        self.assertEqual(InscricaoArquivada.objects.filter(evento_id=self.evento.id).count(), 3)
+
+
+class CrachasFonteTests(SimpleTestCase):
+    """Os nomes dos crachás são em português: as letras acentuadas precisam de glifos reais."""
+
+    def test_letras_acentuadas_tem_glifo(self):
+        fonte = _fonte(40)
+        # Caractere de uso privado, ausente da fonte: desenha o glifo .notdef (o quadrado)
+        notdef = bytes(fonte.getmask('\ue000'))
+        for letra in 'áàâãéêíóôõúçÁÀÂÃÉÊÍÓÔÕÚÇ':
+            with self.subTest(letra=letra):
+                self.assertNotEqual(bytes(fonte.getmask(letra)), notdef)
+
+    def test_nome_acentuado_difere_do_nome_sem_acento(self):
+        def pagina(nome):
+            return _renderizar_pagina(([(nome, '12345678901', 'CK' + 'A' * 26)], 2, 4))
+
+        self.assertNotEqual(pagina('José Gonçalves'), pagina('Jos\ue000 Gon\ue000alves'))
+
+
+class ExportacaoIncrementalTests(TestCase):
+    """Qualquer edição de uma inscrição precisa reescrever a partição do evento."""
+
+    databases = {'default', BANCO_ARQUIVO}
+
+    def setUp(self):
+        self.destino = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.destino, ignore_errors=True)
+        self.participantes = Participante.objects.bulk_create([
+            Participante(nome=f'Aluno {i}', matricula=f'{i:011d}', email=f'aluno{i}@exemplo.com')
+            for i in range(3)
+        ])
+        self.evento = Evento.objects.create(nome='Palestra', data=timezone.now(), vagas=1)
+        self.presente = Inscricao.objects.create(
+            evento=self.evento, participante=self.participantes[0],
+            status='PRESENTE', data_checkin=timezone.now(),
+        )
+        self.espera = Inscricao.objects.create(
+            evento=self.evento, participante=self.participantes[1],
+            status='LISTA_ESPERA', data_entrada_espera=timezone.now(),
+        )
+        exportar_parquet(self.destino)
+
+    def test_sem_alteracoes_nada_e_reescrito(self):
+        self.assertEqual(exportar_parquet(self.destino)['eventos_alterados'], 0)
+
+    def test_troca_de_status(self):
+        self.espera.status = 'INSCRITO'
+        self.espera.save()
+        self.assertEqual(exportar_parquet(self.destino)['eventos_alterados'], 1)
+
+    def test_checkin_corrigido_para_mais_cedo(self):
+        self.presente.data_checkin -= timezone.timedelta(hours=1)
+        self.presente.save()
+        self.assertEqual(exportar_parquet(self.destino)['eventos_alterados'], 1)
+
+    def test_inscricao_passada_para_outro_participante(self):
+        self.espera.participante = self.participantes[2]
+        self.espera.save()
+        self.assertEqual(exportar_parquet(self.destino)['eventos_alterados'], 1)
+
+
+class CheckinTests(TestCase):
+    """As duas rotas de check-in validam a entrada e buscam o participante da mesma forma."""
+
+    def setUp(self):
+        self.participante = Participante.objects.bulk_create([
+            Participante(nome='José Gonçalves', matricula='123.456.789-01', email='jose@exemplo.com'),
+        ])[0]
+        self.evento = Evento.objects.create(nome='Palestra', data=timezone.now(), vagas=10)
+        self.rotas = [
+            reverse('api_checkin', args=[self.evento.id]),
+            reverse('api_checkin_async', args=[self.evento.id]),
+        ]
+
+    async def _post(self, rota, corpo):
+        return await AsyncClient().post(rota, corpo, content_type='application/json')
+
+    async def test_identificador_que_nao_e_texto_devolve_400(self):
+        for rota in self.rotas:
+            for corpo in ({'id_unico_qr': 5}, {'matricula': ['123']}, [1, 2]):
+                with self.subTest(rota=rota, corpo=corpo):
+                    resposta = await self._post(rota, corpo)
+                    self.assertEqual(resposta.status_code, 400)
+
+    async def test_busca_por_cpf_ignora_pontuacao(self):
+        for rota in self.rotas:
+            with self.subTest(rota=rota):
+                await Inscricao.objects.filter(evento=self.evento).adelete()
+                resposta = await self._post(rota, {'matricula': ' 12345678901 '})
+                self.assertEqual(resposta.json()['status'], 'sucesso')
+
+    async def test_busca_por_qr_compacto(self):
+        conteudo = qrcodes.codificar_compacto(self.participante.id_unico_qr)
+        for rota in self.rotas:
+            with self.subTest(rota=rota):
+                await Inscricao.objects.filter(evento=self.evento).adelete()
+                resposta = await self._post(rota, {'id_unico_qr': conteudo})
+                self.assertEqual(resposta.json()['status'], 'sucesso')
+
+    def test_pagina_do_totem_usa_a_rota_configurada(self):
+        pagina = reverse('pagina_checkin', args=[self.evento.id])
+        with override_settings(CHECKIN_ASSINCRONO=False):
+            self.assertContains(self.client.get(pagina), f'`{self.rotas[0]}`')
+        with override_settings(CHECKIN_ASSINCRONO=True):
+            self.assertContains(self.client.get(pagina), f'`{self.rotas[1]}`')
+
+
+class VersoesAoConfirmarTests(TransactionTestCase):
+    """As versões são renovadas uma vez por transação confirmada, e nunca por uma desfeita."""
+
+    def setUp(self):
+        self.eventos = [Evento.objects.create(nome=f'Palestra {i}', data=timezone.now()) for i in range(2)]
+        patcher = mock.patch('core.versoes.registrar_alteracao')
+        self.registrar = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _gravar(self, evento):
+        evento.save()
+
+    def test_varias_gravacoes_numa_transacao(self):
+        with transaction.atomic():
+            for evento in self.eventos:
+                self._gravar(evento)
+                self._gravar(evento)
+        self.registrar.assert_called_once_with({e.id for e in self.eventos}, False)
+
+    def test_rollback_nao_grava_e_a_proxima_transacao_sim(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                self._gravar(self.eventos[0])
+                raise ValueError
+        self.registrar.assert_not_called()
+
+        for _ in range(2):
+            self.registrar.reset_mock()
+            with transaction.atomic():
+                self._gravar(self.eventos[1])
+            self.assertEqual(self.registrar.call_count, 1)
+            self.assertIn(self.eventos[1].id, self.registrar.call_args.args[0])
+
+    def test_savepoint_desfeito_nao_perde_as_alteracoes_seguintes(self):
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    self._gravar(self.eventos[0])
+                    raise ValueError
+            except ValueError:
+                pass
+            self._gravar(self.eventos[1])
+        self.registrar.assert_called_once()
+        self.assertIn(self.eventos[1].id, self.registrar.call_args.args[0])
+
+    def test_fora_de_transacao_grava_na_hora(self):
+        self._gravar(self.eventos[0])
+        self.registrar.assert_called_once_with([self.eventos[0].id], False)
+
+
+class SincronizacaoParticipantesTests(TestCase):
+    """Reenviar a lista geral só grava o que mudou e nunca desativa a base por um arquivo errado."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+        self.linhas = [
+            (2, 'Ana Clara Silva', '202417050385', 'ana@exemplo.com'),
+            (3, 'Bruno Costa Oliveira', '202325010123', 'bruno@exemplo.com'),
+            (4, 'Carla Dias de Andrade', '202216030456', 'carla@exemplo.com'),
+        ]
+        Participante.objects.bulk_create([
+            Participante(
+                nome=nome, matricula=matricula, email=email,
+                hash_conteudo=calcular_hash_conteudo(nome, matricula, email),
+            )
+            for _, nome, matricula, email in self.linhas
+        ])
+
+    def _ativos(self):
+        return set(Participante.objects.filter(ativo=True).values_list('matricula', flat=True))
+
+    def test_reenvio_sem_mudancas_nao_grava(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resumo = sincronizar_participantes(self.linhas, ausentes='desativar')
+        self.assertEqual((resumo['criados'], resumo['atualizados'], resumo['inalterados']), (0, 0, 3))
+        escritas = [q['sql'] for q in consultas if q['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(escritas, [])
+
+    def test_linha_alterada_e_atualizada(self):
+        linhas = [*self.linhas[:2], (4, 'Carla Dias de Andrade', '202216030456', 'carla.andrade@exemplo.com')]
+        resumo = sincronizar_participantes(linhas)
+        self.assertEqual((resumo['atualizados'], resumo['inalterados']), (1, 2))
+        self.assertEqual(Participante.objects.get(matricula='202216030456').email, 'carla.andrade@exemplo.com')
+
+    def test_desativar_recusado_sem_linhas_validas(self):
+        # lista_alunos.csv tem 3 colunas (nome,matricula,email) e a lista geral espera 4
+        arquivo = SimpleUploadedFile('lista_alunos.csv', '\n'.join(
+            f'{nome},{matricula},{email}' for _, nome, matricula, email in self.linhas
+        ).encode('utf-8'))
+        resposta = self.client.post(
+            reverse('cadastro_geral'), {'upload_csv': '1', 'arquivo_csv': arquivo, 'ausentes': 'desativar'},
+        )
+        self.assertEqual(self._ativos(), {matricula for _, _, matricula, _ in self.linhas})
+        mensagens = [str(m) for m in get_messages(resposta.wsgi_request)]
+        self.assertTrue(any(m.startswith('Ninguém foi desativado') for m in mensagens), mensagens)
+
+    def test_linha_rejeitada_impede_desativacao(self):
+        resumo = sincronizar_participantes(self.linhas[:1], ausentes='desativar', rejeitadas=[None])
+        self.assertEqual(resumo['desativados'], 0)
+        self.assertIsNotNone(resumo['desativacao_recusada'])
+        self.assertEqual(len(self._ativos()), 3)
+
+    def test_matricula_rejeitada_conta_como_vista(self):
+        resumo = sincronizar_participantes(self.linhas[:2], ausentes='relatar', rejeitadas=['202216030456'])
+        self.assertEqual(resumo['ausentes'], [])
+
+    def test_arquivo_completo_desativa_ausentes(self):
+        resumo = sincronizar_participantes(self.linhas[:2], ausentes='desativar')
+        self.assertEqual(resumo['desativados'], 1)
+        self.assertEqual(self._ativos(), {'202417050385', '202325010123'})
+
+    def test_participante_que_volta_e_reativado(self):
+        Participante.objects.filter(matricula='202216030456').update(ativo=False)
+        resumo = sincronizar_participantes(self.linhas)
+        self.assertEqual(resumo['atualizados'], 1)
+        self.assertEqual(len(self._ativos()), 3)
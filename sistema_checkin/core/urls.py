@@ -14,9 +14,15 @@ urlpatterns = [
     
     # --- ROTAS DE API E AÇÕES ---
     path('api/checkin/<int:evento_id>/', views.api_checkin, name='api_checkin'),
+    path('api/checkin_async/<int:evento_id>/', views.api_checkin_async, name='api_checkin_async'),
     path('inscricao/<int:inscricao_id>/promover/', views.promover_participante, name='promover_participante'),
     path('evento/<int:evento_id>/exportar_csv/', views.exportar_presenca_csv, name='exportar_presenca_csv'),
     path('eventos/exportar_todos_csv/', views.exportar_todas_presencas_csv, name='exportar_todas_presencas_csv'),
+    path('eventos/exportar_parquet/', views.exportar_parquet_zip, name='exportar_parquet_zip'),
+
+    # --- CRACHÁS PARA IMPRESSÃO ---
+    path('participantes/crachas/', views.gerar_crachas_pdf, name='gerar_crachas_pdf'),
+    path('evento/<int:evento_id>/crachas/', views.gerar_crachas_pdf, name='gerar_crachas_evento_pdf'),
 
     
     # ROTA PARA REMOVER A PRESENÇA DE UM PARTICIPANTE
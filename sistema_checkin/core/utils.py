@@ -0,0 +1,13 @@
+"""Utilitários sem dependências pesadas, compartilhados pelos módulos do app."""
+
+
+def em_lotes(linhas, tamanho_lote):
+    """Agrupa um iterável em listas de até `tamanho_lote` itens."""
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
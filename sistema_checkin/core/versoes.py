@@ -0,0 +1,135 @@
+"""
+Números de versão guardados no cache, usados para invalidar conteúdo
+derivado sem precisar apagar chaves uma a uma: quem monta a chave de cache
+(ou o ETag de uma página) inclui a versão atual, e qualquer gravação gera
+uma versão nova.
+
+- global: muda a cada gravação de Evento, Inscricao ou Participante;
+- calendário: eventos e inscrições (fragmento do calendário em lista_eventos);
+- evento <id>: o evento e as suas inscrições (detalhe_evento, CSV de presença);
+- participantes: o cadastro geral (lista geral, nomes nas listas dos eventos).
+
+Cada versão é o instante da alteração em nanossegundos (time.time_ns), de
+modo que também serve como data de Last-Modified.
+
+Os sinais em core/signals.py cobrem save() e delete(); operações em lote
+(bulk_create, update) precisam chamar `registrar_alteracao_ao_confirmar()`.
+Dentro de uma transação, as alterações são acumuladas e gravadas no cache
+uma única vez, no commit, e não uma vez por linha.
+"""
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.db import transaction
+
+CHAVE_GLOBAL = 'versao:global'
+CHAVE_CALENDARIO = 'versao:calendario'
+CHAVE_PARTICIPANTES = 'versao:participantes'
+CHAVE_EVENTO = 'versao:evento:{}'
+
+
+def _versao(chave):
+    versao = cache.get(chave)
+    if versao is None:
+        # Cache vazio (ou expurgado): começa uma versão nova, o que no pior
+        # caso invalida à toa o que estava guardado com a anterior.
+        versao = time.time_ns()
+        cache.add(chave, versao, None)
+        versao = cache.get(chave, versao)
+    return versao
+
+
+def versao_global():
+    return _versao(CHAVE_GLOBAL)
+
+
+def versao_calendario():
+    return _versao(CHAVE_CALENDARIO)
+
+
+def versao_participantes():
+    return _versao(CHAVE_PARTICIPANTES)
+
+
+def versao_evento(evento_id):
+    return _versao(CHAVE_EVENTO.format(evento_id))
+
+
+def como_data(versao):
+    """Converte uma versão (nanossegundos) em datetime UTC, para o Last-Modified."""
+    return datetime.fromtimestamp(versao / 1e9, tz=timezone.utc)
+
+
+def _chaves_alteradas(evento_ids, participantes):
+    chaves = [CHAVE_GLOBAL]
+    if evento_ids:
+        chaves.append(CHAVE_CALENDARIO)
+        chaves.extend(CHAVE_EVENTO.format(evento_id) for evento_id in set(evento_ids))
+    if participantes:
+        chaves.append(CHAVE_PARTICIPANTES)
+    return chaves
+
+
+def registrar_alteracao(evento_ids=(), participantes=False):
+    """
+    Gera versões novas para o que mudou: sempre a global; o calendário e os
+    eventos em `evento_ids` quando eventos ou inscrições foram gravados; a
+    dos participantes com `participantes=True`.
+    """
+    agora = time.time_ns()
+    cache.set_many({chave: agora for chave in _chaves_alteradas(evento_ids, participantes)}, None)
+
+
+class _AlteracoesPendentes:
+    """
+    Alterações acumuladas numa transação, gravadas de uma vez no commit.
+
+    O mesmo objeto é registrado em on_commit a cada alteração, para continuar
+    na fila mesmo que o savepoint onde entrou primeiro seja desfeito; só a
+    primeira chamada grava no cache, as demais não fazem nada.
+    """
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.evento_ids = set()
+        self.participantes = False
+        self.gravado = False
+
+    def __call__(self):
+        if self.gravado:
+            return
+        self.gravado = True
+        # A próxima transação começa outro acúmulo
+        if getattr(self.conexao, 'alteracoes_pendentes', None) is self:
+            self.conexao.alteracoes_pendentes = None
+        registrar_alteracao(self.evento_ids, self.participantes)
+
+
+def registrar_alteracao_ao_confirmar(evento_ids=(), participantes=False, using=None):
+    """
+    Como `registrar_alteracao`, mas só depois do commit: antes disso outra
+    requisição poderia guardar no cache (ou devolver num ETag), já com a
+    versão nova, conteúdo montado com os dados antigos.
+
+    Todas as chamadas de uma mesma transação se juntam num único acúmulo,
+    de modo que apagar um evento com milhares de inscrições (um sinal por
+    linha) grava as versões no cache uma só vez. Depois de um rollback o
+    acúmulo não é gravado e segue para a transação seguinte, o que no pior
+    caso renova à toa as versões do que foi desfeito.
+    """
+    conexao = transaction.get_connection(using)
+    if not conexao.in_atomic_block:
+        registrar_alteracao(evento_ids, participantes)
+        return
+    pendentes = getattr(conexao, 'alteracoes_pendentes', None)
+    if pendentes is None:
+        pendentes = conexao.alteracoes_pendentes = _AlteracoesPendentes(conexao)
+    pendentes.evento_ids.update(evento_ids)
+    pendentes.participantes = pendentes.participantes or participantes
+    transaction.on_commit(pendentes, using=using)
+
+
+async def aregistrar_alteracao(evento_ids=(), participantes=False):
+    agora = time.time_ns()
+    await cache.aset_many({chave: agora for chave in _chaves_alteradas(evento_ids, participantes)}, None)
@@ -1,70 +1,151 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_POST, condition
+from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
 from .models import Participante, Evento, Inscricao
 import pandas as pd
 import io
 import json
 import csv
+import hashlib
 from django.utils import timezone
+from django.db.models import Count, Q, Value
+from django.db.models.functions import Replace, TruncDate
+from datetime import date, datetime, time, timedelta
 from django.contrib import messages # Importar o messages framework
 from .forms import ParticipanteForm
-from django.core.mail import EmailMessage
-from django.template.loader import render_to_string
-
-
-# --- FUNÇÃO AUXILIAR ATUALIZADA ---
-def _enviar_qr_code_email(participante):
+from django.conf import settings
+from pathlib import Path
+import tempfile
+import zipfile
+from .exportacao import exportar_parquet, trava_exportacao
+from .arquivamento import presencas_todos_eventos
+from .importacao import sincronizar_participantes
+from .versoes import (
+    versao_global, versao_calendario, versao_participantes, versao_evento, como_data, aregistrar_alteracao,
+)
+from .emails import enviar_qr_code_email
+from .crachas import dados_crachas, gerar_pdf_crachas, COLUNAS_PADRAO, LINHAS_PADRAO
+from . import qrcodes
+
+
+# --- Respostas condicionais (ETag/Last-Modified) ---
+def _get_condicional(versoes):
     """
-    Função auxiliar que monta e envia o e-mail com QR Code para um participante.
-    Atualiza o campo 'ultimo_envio_email' se o envio for bem-sucedido.
-    Retorna True se o e-mail foi enviado com sucesso, False caso contrário.
+    Decorador condition() a partir de `versoes(request, *args, **kwargs)`, que
+    devolve as versões (core/versoes.py) das quais a página depende. Se nada
+    mudou desde a última visita, o navegador recebe um 304 e a view nem roda.
+
+    As versões são lidas antes da view: se uma gravação acontecer no meio, a
+    página sai com dados novos e ETag antigo e é apenas refeita na próxima vez.
     """
-    if not participante.qr_code_img:
-        return False
-    
-    try:
-        contexto_email = {'nome_participante': participante.nome}
-        corpo_email = render_to_string('core/email_qrcode_geral.html', contexto_email)
-
-        email = EmailMessage(
-            subject="Seu QR Code de Acesso para Eventos",
-            body=corpo_email,
-            from_email=None,
-            to=[participante.email]
-        )
-        email.content_subtype = "html"
-        email.attach_file(participante.qr_code_img.path)
-        
-        email.send()
+    def sem_mensagens(request):
+        # Um 304 esconderia as mensagens pendentes (ex.: logo após um redirect)
+        return not len(messages.get_messages(request))
+
+    def etag(request, *args, **kwargs):
+        if not sem_mensagens(request):
+            return None
+        # Usuário e cookie CSRF entram no ETag: a página traz o token dos formulários
+        partes = [
+            *versoes(request, *args, **kwargs),
+            request.user.pk,
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        ]
+        return hashlib.sha1('|'.join(str(p) for p in partes).encode('utf-8')).hexdigest()
+
+    def ultima_modificacao(request, *args, **kwargs):
+        if not sem_mensagens(request):
+            return None
+        return como_data(max(versoes(request, *args, **kwargs)))
 
-        # --- MUDANÇA IMPORTANTE ---
-        # Se o e-mail foi enviado, atualiza o campo com a data e hora atuais
-        participante.ultimo_envio_email = timezone.now()
-        participante.save(update_fields=['ultimo_envio_email'])
+    return condition(etag_func=etag, last_modified_func=ultima_modificacao)
+
+
+def _versoes_lista_eventos(request):
+    # A janela padrão do calendário muda à meia-noite, mesmo sem gravações
+    inicio_do_dia = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    return versao_calendario(), int(inicio_do_dia.timestamp()) * 10**9
+
+
+def _versoes_evento(request, evento_id):
+    return versao_evento(evento_id), versao_participantes()
 
-        return True
-    except Exception as e:
-        print(f"Erro ao enviar e-mail para {participante.nome}: {e}")
-        return False
 
 # --- Visões de Gestão de Eventos ---
-def lista_eventos(request):
-    from itertools import groupby
-    from django.utils.timezone import localtime
+DATA_MINIMA_CALENDARIO = date(1900, 1, 1)
+DATA_MAXIMA_CALENDARIO = date(9000, 12, 31)
+
 
-    # Ordena por data
-    eventos = Evento.objects.all().order_by('data')
+def _janela_calendario(request):
+    """
+    Define a janela de datas de lista_eventos a partir de '?periodo=semana|mes'
+    e '?inicio=AAAA-MM-DD'. Sem período, mostra a última semana e o próximo mês.
+    Retorna (periodo, inicio, fim, anterior, proximo), com `fim` exclusivo.
+    """
+    hoje = timezone.localdate()
+    periodo = request.GET.get('periodo')
+    try:
+        referencia = date.fromisoformat(request.GET.get('inicio', ''))
+    except ValueError:
+        referencia = hoje
+    # Perto de date.min/date.max a janela e os links de navegação estourariam (OverflowError)
+    if not DATA_MINIMA_CALENDARIO <= referencia <= DATA_MAXIMA_CALENDARIO:
+        referencia = hoje
+
+    if periodo == 'semana':
+        inicio = referencia - timedelta(days=referencia.weekday())
+        fim = inicio + timedelta(days=7)
+        anterior = inicio - timedelta(days=7)
+    elif periodo == 'mes':
+        inicio = referencia.replace(day=1)
+        fim = (inicio + timedelta(days=32)).replace(day=1)
+        anterior = (inicio - timedelta(days=1)).replace(day=1)
+    else:
+        return None, hoje - timedelta(days=7), hoje + timedelta(days=31), None, None
+    return periodo, inicio, fim, anterior, fim
 
-    # Agrupa os eventos pelo dia (ignorando hora)
-    eventos_por_dia = {}
-    for data, grupo in groupby(eventos, key=lambda e: localtime(e.data).date()):
-        eventos_por_dia[data] = list(grupo)
 
-    return render(request, 'core/lista_eventos.html', {'eventos_por_dia': eventos_por_dia})
+@gzip_page
+@cache_control(private=True, no_cache=True)
+@_get_condicional(_versoes_lista_eventos)
+def lista_eventos(request):
+    periodo, inicio, fim, anterior, proximo = _janela_calendario(request)
+    fuso = timezone.get_current_timezone()
+
+    # Consulta preguiçosa: só é executada se o fragmento não estiver em cache.
+    # O dia é truncado no banco e a ocupação vem na mesma consulta.
+    eventos = (
+        Evento.objects
+        .filter(
+            data__gte=timezone.make_aware(datetime.combine(inicio, time.min), fuso),
+            data__lt=timezone.make_aware(datetime.combine(fim, time.min), fuso),
+        )
+        .annotate(
+            dia=TruncDate('data', tzinfo=fuso),
+            inscritos=Count('inscricoes'),
+            presentes=Count('inscricoes', filter=Q(inscricoes__status='PRESENTE')),
+        )
+        .order_by('data')
+    )
+
+    return render(request, 'core/lista_eventos.html', {
+        'eventos': eventos,
+        'periodo': periodo or '',
+        'inicio': inicio,
+        'fim': fim,
+        'fim_exibicao': fim - timedelta(days=1),
+        'anterior': anterior,
+        'proximo': proximo,
+        'versao_calendario': versao_calendario(),
+    })
 
 
+@gzip_page
+@cache_control(private=True, no_cache=True)
+@_get_condicional(_versoes_evento)
 def detalhe_evento(request, evento_id):
     evento = get_object_or_404(Evento, id=evento_id)
     inscricoes = evento.inscricoes.all()
@@ -138,41 +219,70 @@ def pagina_checkin(request, evento_id):
     vagas_disponiveis = evento.vagas - evento.inscricoes.filter(status='PRESENTE').count()
     return render(request, 'core/checkin.html', {
         'evento': evento,
-        'vagas_disponiveis': vagas_disponiveis
+        'vagas_disponiveis': vagas_disponiveis,
+        # Com CHECKIN_ASSINCRONO o totem envia as leituras para api_checkin_async
+        'checkin_assincrono': settings.CHECKIN_ASSINCRONO,
     })
 
+
+def _ler_identificadores(corpo):
+    """
+    Lê `id_unico_qr` e `matricula` do JSON enviado pelo totem. Levanta
+    ValueError se o corpo não for um objeto JSON ou se algum deles não for texto.
+    """
+    data = json.loads(corpo)
+    if not isinstance(data, dict):
+        raise ValueError('O corpo da requisição deve ser um objeto JSON.')
+    id_unico_qr = data.get('id_unico_qr')
+    matricula = data.get('matricula')
+    for valor in (id_unico_qr, matricula):
+        if valor is not None and not isinstance(valor, str):
+            raise ValueError('QR Code e CPF devem ser enviados como texto.')
+    return id_unico_qr, matricula
+
+
+def _busca_participante(id_unico_qr, matricula):
+    """
+    QuerySet com o participante do QR Code (compacto ou legado) ou do CPF
+    digitado, usado pelas duas rotas de check-in. Retorna None se nenhum
+    identificador foi enviado.
+    """
+    if id_unico_qr:
+        return Participante.objects.filter(id_unico_qr=qrcodes.decodificar(id_unico_qr))
+    if matricula:
+        # Remove espaços, pontos e traços do CPF digitado e compara no banco
+        # com a matrícula normalizada da mesma forma
+        cpf_digitado = matricula.strip().replace('.', '').replace('-', '')
+        return (
+            Participante.objects
+            .annotate(cpf=Replace(Replace('matricula', Value('.'), Value('')), Value('-'), Value('')))
+            .filter(cpf=cpf_digitado)
+        )
+    return None
+
+
 @csrf_exempt
 @csrf_exempt
 def api_checkin(request, evento_id):
     if request.method == 'POST':
         try:
-            data = json.loads(request.body)
-            id_unico_qr = data.get('id_unico_qr')
-            matricula = data.get('matricula')
+            try:
+                id_unico_qr, matricula = _ler_identificadores(request.body)
+            except ValueError:
+                return JsonResponse({'status': 'erro', 'mensagem': 'Requisição inválida.'}, status=400)
 
             evento = get_object_or_404(Evento, id=evento_id)
-            participante = None
 
             # --- BUSCA PELO QR CODE OU CPF ---
-            if id_unico_qr:
-                participante = get_object_or_404(Participante, id_unico_qr=id_unico_qr)
-
-            elif matricula:
-                # Remove espaços, pontos e traços do CPF digitado
-                cpf_digitado = matricula.strip().replace('.', '').replace('-', '')
-
-                # Procura participante ignorando formatação
-                for p in Participante.objects.all():
-                    cpf_salvo = p.matricula.replace('.', '').replace('-', '')
-                    if cpf_salvo == cpf_digitado:
-                        participante = p
-                        break
-
-                if not participante:
-                    return JsonResponse({'status': 'erro', 'mensagem': 'Participante não encontrado. Verifique o CPF.'}, status=404)
-
-            else:
+            busca = _busca_participante(id_unico_qr, matricula)
+            if busca is None:
                 return JsonResponse({'status': 'erro', 'mensagem': 'Nenhum identificador (QR Code ou CPF) foi fornecido.'}, status=400)
+            participante = busca.first()
+            if participante is None:
+                return JsonResponse({'status': 'erro', 'mensagem': 'Participante não encontrado. Verifique o CPF ou QR Code.'}, status=404)
+
+            if not participante.ativo:
+                return JsonResponse({'status': 'erro', 'mensagem': f'{participante.nome} está inativo(a) no cadastro geral.'}, status=403)
 
             # --- REGISTRO DO CHECK-IN ---
             inscricao, created = Inscricao.objects.get_or_create(
@@ -192,13 +302,59 @@ def api_checkin(request, evento_id):
 
             return JsonResponse({'status': 'sucesso', 'mensagem': mensagem})
 
-        except Participante.DoesNotExist:
-            return JsonResponse({'status': 'erro', 'mensagem': 'Participante não encontrado. Verifique o CPF ou QR Code.'}, status=404)
         except Exception as e:
             return JsonResponse({'status': 'erro', 'mensagem': str(e)}, status=400)
 
     return JsonResponse({'status': 'erro', 'mensagem': 'Método inválido.'}, status=405)
 
+
+@csrf_exempt
+async def api_checkin_async(request, evento_id):
+    """
+    Versão assíncrona de api_checkin, para servidores ASGI (ex.: uvicorn).
+    Enquanto espera o banco, a requisição não prende uma thread do servidor.
+
+    O Django ainda não tem transações assíncronas, então a presença é gravada
+    com um único UPDATE condicional (status diferente de PRESENTE): se dois
+    totens lerem o mesmo QR ao mesmo tempo, só um deles registra o check-in.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'status': 'erro', 'mensagem': 'Método inválido.'}, status=405)
+
+    try:
+        id_unico_qr, matricula = _ler_identificadores(request.body)
+    except ValueError:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Requisição inválida.'}, status=400)
+
+    try:
+        evento = await Evento.objects.aget(id=evento_id)
+    except Evento.DoesNotExist:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Evento não encontrado.'}, status=404)
+
+    # --- BUSCA PELO QR CODE OU CPF ---
+    busca = _busca_participante(id_unico_qr, matricula)
+    if busca is None:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Nenhum identificador (QR Code ou CPF) foi fornecido.'}, status=400)
+    participante = await busca.afirst()
+
+    if participante is None:
+        return JsonResponse({'status': 'erro', 'mensagem': 'Participante não encontrado. Verifique o CPF ou QR Code.'}, status=404)
+    if not participante.ativo:
+        return JsonResponse({'status': 'erro', 'mensagem': f'{participante.nome} está inativo(a) no cadastro geral.'}, status=403)
+
+    # --- REGISTRO DO CHECK-IN ---
+    inscricao, _ = await Inscricao.objects.aget_or_create(participante=participante, evento=evento)
+    registradas = await (
+        Inscricao.objects.filter(pk=inscricao.pk).exclude(status='PRESENTE')
+        .aupdate(status='PRESENTE', data_checkin=timezone.now())
+    )
+    if not registradas:
+        return JsonResponse({'status': 'aviso', 'mensagem': f'{participante.nome} já realizou o check-in.'})
+
+    # aupdate não dispara sinais; a ocupação e as listas do evento mudaram
+    await aregistrar_alteracao([evento.id])
+    return JsonResponse({'status': 'sucesso', 'mensagem': f'Check-in de {participante.nome} realizado com sucesso!'})
+
     
 def cadastro_geral(request):
     manual_form = ParticipanteForm()
@@ -211,7 +367,7 @@ def cadastro_geral(request):
                 novo_participante = manual_form.save()
                 messages.success(request, f"Participante '{novo_participante.nome}' cadastrado com sucesso!")
 
-                if _enviar_qr_code_email(novo_participante):
+                if enviar_qr_code_email(novo_participante):
                     messages.info(request, f"O QR Code foi enviado para o e-mail de {novo_participante.nome}.")
                 else:
                     messages.error(request, f"Falha ao enviar o e-mail com QR Code para {novo_participante.nome}.")
@@ -232,12 +388,16 @@ def cadastro_geral(request):
                 # Ignora o cabeçalho
                 next(reader, None)
 
-                criados, atualizados, erros = 0, 0, []
+                registros, erros = [], []
+                # Matrículas das linhas recusadas (None se ilegível): contam como
+                # presentes na lista e impedem a desativação dos ausentes
+                rejeitadas = []
 
                 for i, row in enumerate(reader, start=2):
                     # Esperado: id,nome,matricula,email
                     if len(row) < 4:
                         erros.append(f"Linha {i}: formato incorreto (esperado id,nome,matricula,email).")
+                        rejeitadas.append(None)
                         continue
 
                     try:
@@ -246,26 +406,38 @@ def cadastro_geral(request):
                         email = row[3].strip()
                     except Exception as e:
                         erros.append(f"Linha {i}: erro ao ler campos ({e}).")
+                        rejeitadas.append(None)
                         continue
 
                     if not nome or not matricula or not email:
                         erros.append(f"Linha {i}: campos vazios.")
+                        rejeitadas.append(matricula)
                         continue
 
-                    try:
-                        participante, created = Participante.objects.update_or_create(
-                            matricula=matricula,
-                            defaults={'nome': nome, 'email': email}
-                        )
-                        if created:
-                            criados += 1
-                        else:
-                            atualizados += 1
-                    except Exception as e:
-                        erros.append(f"Linha {i}: erro ao salvar ({e}).")
-                        continue
-
-                messages.success(request, f"Importação concluída: {criados} criados e {atualizados} atualizados.")
+                    registros.append((i, nome, matricula, email))
+
+                # Só as linhas novas ou alteradas (comparadas por hash) são gravadas
+                ausentes = request.POST.get('ausentes') or None
+                resumo = sincronizar_participantes(registros, ausentes=ausentes, rejeitadas=rejeitadas)
+
+                messages.success(
+                    request,
+                    f"Importação concluída: {resumo['criados']} criados, {resumo['atualizados']} atualizados "
+                    f"e {resumo['inalterados']} sem alterações."
+                )
+                if resumo['ausentes']:
+                    acao = "foram desativados" if resumo['desativados'] else "não estão na nova lista"
+                    messages.warning(
+                        request,
+                        f"{len(resumo['ausentes'])} participantes {acao}: {', '.join(resumo['ausentes'][:50])}"
+                        + (" ..." if len(resumo['ausentes']) > 50 else "")
+                    )
+                if resumo['desativacao_recusada']:
+                    messages.error(
+                        request,
+                        f"Ninguém foi desativado: {resumo['desativacao_recusada']}. "
+                        "Corrija o arquivo e envie novamente."
+                    )
                 if erros:
                     messages.warning(request, "Problemas encontrados:\n" + " | ".join(erros))
 
@@ -288,7 +460,7 @@ def cadastro_geral(request):
                 messages.success(request, f"Participante '{novo_participante.nome}' cadastrado com sucesso!")
                 
                 # --- MUDANÇA: ENVIA O E-MAIL AUTOMATICAMENTE ---
-                if _enviar_qr_code_email(novo_participante):
+                if enviar_qr_code_email(novo_participante):
                     messages.info(request, f"O QR Code foi enviado para o e-mail de {novo_participante.nome}.")
                 else:
                     messages.error(request, f"Falha ao enviar o e-mail com QR Code para {novo_participante.nome}.")
@@ -341,6 +513,9 @@ def cadastro_geral(request):
     return render(request, 'core/cadastro_geral.html', {'manual_form': manual_form})
 
 
+@gzip_page
+@cache_control(private=True, no_cache=True)
+@_get_condicional(lambda request: (versao_participantes(),))
 def lista_geral_participantes(request):
     participantes = Participante.objects.all().order_by('nome')
     return render(request, 'core/lista_geral_participantes.html', {'participantes': participantes})
@@ -360,6 +535,8 @@ def remover_presenca(request, inscricao_id):
     messages.info(request, f"{inscricao.participante.nome} foi movido(a) para o final da lista de espera.")
     return redirect('detalhe_evento', evento_id=inscricao.evento.id)
 
+@gzip_page
+@_get_condicional(_versoes_evento)
 def exportar_presenca_csv(request, evento_id):
     evento = get_object_or_404(Evento, id=evento_id)
     response = HttpResponse(content_type='text/csv')
@@ -377,6 +554,8 @@ def exportar_presenca_csv(request, evento_id):
         ])
     return response
     
+@gzip_page
+@_get_condicional(lambda request: (versao_global(),))
 def exportar_todas_presencas_csv(request):
     response = HttpResponse(content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="presenca_todos_eventos.csv"'
@@ -385,32 +564,73 @@ def exportar_todas_presencas_csv(request):
 
     writer.writerow(['Evento', 'Nome', 'Matrícula', 'Email', 'Horário do Check-in'])
 
-    eventos = Evento.objects.all().order_by('data')
-    for evento in eventos:
-        presentes = evento.inscricoes.filter(status='PRESENTE').order_by('participante__nome')
-        for inscricao in presentes:
-            writer.writerow([
-                evento.nome,
-                inscricao.participante.nome,
-                inscricao.participante.matricula,
-                inscricao.participante.email,
-                inscricao.data_checkin.strftime('%d/%m/%Y %H:%M:%S') if inscricao.data_checkin else ''
-            ])
+    # Inclui os eventos já movidos para o banco de arquivo
+    for nome_evento, nome, matricula, email, data_checkin in presencas_todos_eventos():
+        writer.writerow([
+            nome_evento,
+            nome,
+            matricula,
+            email,
+            data_checkin.strftime('%d/%m/%Y %H:%M:%S') if data_checkin else ''
+        ])
+
+    return response
+
+def exportar_parquet_zip(request):
+    """
+    Atualiza (de forma incremental) o arquivo Parquet de todos os eventos e
+    devolve o diretório compactado em .zip para uso em ferramentas de BI.
+    """
+    destino = Path(settings.EXPORTACAO_PARQUET_DIR)
+    exportar_parquet(destino)
+
+    arquivo_zip = tempfile.TemporaryFile()
+    # A trava impede que outra exportação troque partições no meio da compactação.
+    # Parquet já é comprimido; ZIP_STORED evita gastar CPU comprimindo de novo.
+    with trava_exportacao(destino), zipfile.ZipFile(arquivo_zip, 'w', zipfile.ZIP_STORED) as zf:
+        for caminho in sorted(destino.rglob('*')):
+            if caminho.is_file() and not any(p.startswith('.') for p in caminho.relative_to(destino).parts):
+                zf.write(caminho, caminho.relative_to(destino).as_posix())
+    arquivo_zip.seek(0)
+    return FileResponse(arquivo_zip, as_attachment=True, filename='eventos_parquet.zip')
+
+def gerar_crachas_pdf(request, evento_id=None):
+    """
+    Gera as folhas de crachás em PDF para os inscritos de um evento ou, sem
+    evento, para toda a base. Aceita '?colunas=' e '?linhas=' por página.
+    """
+    evento = get_object_or_404(Evento, id=evento_id) if evento_id else None
+    try:
+        colunas = min(max(int(request.GET.get('colunas', COLUNAS_PADRAO)), 1), 6)
+        linhas = min(max(int(request.GET.get('linhas', LINHAS_PADRAO)), 1), 8)
+    except ValueError:
+        colunas, linhas = COLUNAS_PADRAO, LINHAS_PADRAO
+
+    if evento:
+        nome_arquivo = f'crachas_{evento.nome.lower().replace(" ", "_")}.pdf'
+    else:
+        nome_arquivo = 'crachas_todos_participantes.pdf'
 
+    response = StreamingHttpResponse(
+        gerar_pdf_crachas(dados_crachas(evento), colunas=colunas, linhas=linhas),
+        content_type='application/pdf',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
     return response
 
 
 @require_POST
 def enviar_emails_gerais_qrcode(request):
-    participantes = Participante.objects.all()
+    # Participantes desativados na sincronização da lista geral não recebem envios em massa
+    participantes = Participante.objects.filter(ativo=True)
     if not participantes:
-        messages.warning(request, "Não há participantes cadastrados.")
+        messages.warning(request, "Não há participantes ativos cadastrados.")
         return redirect('lista_geral_participantes')
 
     enviados_com_sucesso = 0
     erros = []
     for participante in participantes:
-        if _enviar_qr_code_email(participante):
+        if enviar_qr_code_email(participante):
             enviados_com_sucesso += 1
         else:
             erros.append(participante.nome)
@@ -426,7 +646,7 @@ def enviar_emails_gerais_qrcode(request):
 @require_POST
 def enviar_emails_pendentes(request):
     # Filtra apenas os participantes que NUNCA receberam o e-mail
-    participantes_pendentes = Participante.objects.filter(ultimo_envio_email__isnull=True)
+    participantes_pendentes = Participante.objects.filter(ultimo_envio_email__isnull=True, ativo=True)
     
     if not participantes_pendentes:
         messages.info(request, "Não há participantes com envios de e-mail pendentes.")
@@ -435,7 +655,7 @@ def enviar_emails_pendentes(request):
     enviados_com_sucesso = 0
     erros = []
     for participante in participantes_pendentes:
-        if _enviar_qr_code_email(participante):
+        if enviar_qr_code_email(participante):
             enviados_com_sucesso += 1
         else:
             erros.append(participante.nome)
@@ -452,7 +672,7 @@ def enviar_emails_pendentes(request):
 def enviar_email_individual(request, participante_id):
     participante = get_object_or_404(Participante, id=participante_id)
     
-    if _enviar_qr_code_email(participante):
+    if enviar_qr_code_email(participante):
         messages.success(request, f"E-mail com QR Code enviado com sucesso para {participante.nome}!")
     else:
         messages.error(request, f"Ocorreu um erro ao tentar enviar o e-mail para {participante.nome}.")
@@ -82,6 +82,25 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # Eventos encerrados e suas inscrições (comando 'arquivar_eventos')
+    'arquivo': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'arquivo.sqlite3',
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.ArquivoRouter']
+
+
+# Cache
+# Baseado em arquivos para ser compartilhado entre processos do servidor: a
+# invalidação do calendário (core/versoes.py) precisa valer para todos eles.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
     }
 }
 
@@ -134,6 +153,13 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Diretório onde a exportação Parquet (comando 'exportar_parquet') é mantida
+EXPORTACAO_PARQUET_DIR = os.path.join(BASE_DIR, 'exportacoes', 'parquet')
+
+# Com CHECKIN_ASSINCRONO=1 no .env a página do totem envia as leituras para a
+# rota assíncrona (api/checkin_async/), que exige um servidor ASGI (uvicorn)
+CHECKIN_ASSINCRONO = os.getenv('CHECKIN_ASSINCRONO', '').lower() in ('1', 'true', 'sim')
+
 # CONFIGURAÇÃO DE E-MAIL PARA PRODUÇÃO/TESTE REAL
 # ------------------------------------------------------------------------------
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'